@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def post_worksheet(url, payload, timeout):
+    request = urllib.request.Request(f"{url}/pauta", data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            size = len(response.read())
+            return response.status, time.perf_counter() - start, size, response.headers.get("X-Cache")
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, time.perf_counter() - start, 0, None
+    except OSError:
+        return "erro", time.perf_counter() - start, 0, None
+
+
+def fetch_metrics(url, timeout=10):
+    with urllib.request.urlopen(f"{url}/metrics", timeout=timeout) as response:
+        return json.load(response)
+
+
+def run_load(url, requests, concurrency, payload, distinct_seeds=0, timeout=60):
+    def make_payload(index):
+        if distinct_seeds and payload.get("mode") == "aleatorio":
+            return dict(payload, seed=index % distinct_seeds)
+        return payload
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda index: post_worksheet(url, make_payload(index), timeout),
+                                    range(requests)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = sorted(seconds for status, seconds, _, _ in results if status == 200)
+    
+    def percentile(fraction):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+    
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_seconds": elapsed,
+        "statuses": {str(status): count for status, count in Counter(r[0] for r in results).items()},
+        "cache_hits": sum(1 for r in results if r[3] == "HIT"),
+        "bytes": sum(r[2] for r in results),
+        "requests_per_second": requests / elapsed if elapsed else 0.0,
+        "ok_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.http_load",
+        description="Teste de carga do servidor de pautas (python -m src.server) em localhost."
+    )
+    parser.add_argument("--url", default=None,
+                        help="servidor já em execução (padrão: inicia um servidor local temporário)")
+    parser.add_argument("-n", "--requests", type=int, default=200,
+                        help="total de requisições (padrão: 200)")
+    parser.add_argument("-c", "--concurrency", type=int, default=16,
+                        help="requisições simultâneas (padrão: 16)")
+    parser.add_argument("--pages", type=int, default=1,
+                        help="páginas por PDF (padrão: 1)")
+    parser.add_argument("--mode", choices=("sequencial", "aleatorio"), default="aleatorio")
+    parser.add_argument("--distinct-seeds", type=int, default=0,
+                        help="sementes diferentes usadas em rodízio (0 = uma semente aleatória por pedido)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="processos do servidor local temporário")
+    parser.add_argument("--queue", type=int, default=None,
+                        help="fila do servidor local temporário")
+    parser.add_argument("-o", "--output", default=None,
+                        help="grava o resultado e as métricas do servidor em JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    payload = {"pages": args.pages, "mode": args.mode}
+    
+    server = None
+    url = args.url
+    if url is None:
+        from src.server.service import create_server, DEFAULT_QUEUE_SIZE
+        
+        queue_size = args.queue if args.queue is not None else DEFAULT_QUEUE_SIZE
+        server = create_server("127.0.0.1", 0, args.workers, queue_size)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    try:
+        post_worksheet(url, dict(payload, mode="sequencial"), 60)
+        result = run_load(url.rstrip("/"), args.requests, args.concurrency, payload, args.distinct_seeds)
+        result["server_metrics"] = fetch_metrics(url)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+    
+    latency = result["latency_ms"]
+    print(f"{args.requests} requisições, {args.concurrency} simultâneas: {result['elapsed_seconds']:.2f}s")
+    print(f"Status: {result['statuses']}  cache: {result['cache_hits']} acertos")
+    print(f"Vazão: {result['ok_per_second']:.1f} PDFs/s")
+    print(f"Latência: p50 {latency['p50']:.0f} ms, p95 {latency['p95']:.0f} ms, "
+          f"p99 {latency['p99']:.0f} ms, máx {latency['max']:.0f} ms")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+import argparse
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+from src.config import settings
+from src.core import note_helpers
+
+
+DEFAULT_OUTPUT = "bench_output.json"
+
+PAGE_COUNTS = (1, 10, 100, 1000)
+
+QUICK_PAGE_COUNTS = (1, 10, 100)
+
+STAFF_COUNTS = (1, 3, 6)
+
+NOTES_PER_STAFF = (5, 11, 17)
+
+MODES = ("sequencial", "aleatorio")
+
+HELPER_POSITIONS = 100000
+
+RASTER_PAGES = 10
+
+PREVIEW_WIDTH = 700
+
+SAMPLING_NOTES = 1000000
+
+OUTPUT_PROFILES = (
+    ("padrao", {}),
+    ("compacto", {"output_profile": "compacto"}),
+    ("compacto_otimizado", {"output_profile": "compacto", "optimize": True}),
+)
+
+SAMPLING_CONSTRAINTS = (
+    ("livre", None),
+    ("sem_repeticao", {"no_repeat": True}),
+    ("salto_2", {"no_repeat": True, "max_interval": 2}),
+    ("todas_cordas", {"cover_strings": True}),
+)
+
+
+def measure(func, repeat):
+    gc.collect()
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        "wall_seconds": min(times),
+        "wall_seconds_all": times,
+        "peak_bytes": peak,
+    }, result
+
+
+def bench_generate(page_counts, repeat):
+    from src.core.pdf_generator import PautaPDFGenerator
+    
+    generator = PautaPDFGenerator()
+    cases = []
+    for mode in MODES:
+        for pages in page_counts:
+            cases.append((pages, 6, 17, mode))
+        for quantity in STAFF_COUNTS:
+            for notes_per_staff in NOTES_PER_STAFF:
+                cases.append((10, quantity, notes_per_staff, mode))
+    
+    results = []
+    for pages, quantity, notes_per_staff, mode in dict.fromkeys(cases):
+        def run():
+            buffer = io.BytesIO()
+            generator.generate(settings.DEFAULT_SEQUENCE, quantity, buffer, pages,
+                               staff_gap_cm=4.0, random_mode=(mode == "aleatorio"),
+                               notes_per_staff=notes_per_staff, seed=1)
+            return len(buffer.getvalue())
+        
+        stats, pdf_bytes = measure(run, 1 if pages >= 1000 else repeat)
+        stats.update({
+            "name": "generate",
+            "params": {"pages": pages, "quantity": quantity,
+                       "notes_per_staff": notes_per_staff, "mode": mode},
+            "pdf_bytes": pdf_bytes,
+            "pages_per_second": pages / stats["wall_seconds"],
+        })
+        results.append(stats)
+    return results
+
+
+def bench_profiles(page_counts, repeat):
+    from src.core.pdf_generator import PautaPDFGenerator
+    
+    results = []
+    for name, options in OUTPUT_PROFILES:
+        generator = PautaPDFGenerator(**options)
+        for pages in page_counts:
+            def run():
+                return len(generator.generate_bytes(settings.DEFAULT_SEQUENCE, 6, pages, staff_gap_cm=4.0,
+                                                    random_mode=True, notes_per_staff=17, seed=1))
+            
+            stats, pdf_bytes = measure(run, 1 if pages >= 1000 else repeat)
+            stats.update({
+                "name": "generate.profile",
+                "params": {"profile": name, "pages": pages},
+                "pdf_bytes": pdf_bytes,
+                "bytes_per_page": pdf_bytes / pages,
+                "ms_per_page": stats["wall_seconds"] * 1000 / pages,
+            })
+            results.append(stats)
+    return results
+
+
+def bench_note_helpers(repeat):
+    y_staff = 100.0
+    positions = [y_staff - 40 + (i % 1200) * 0.1 for i in range(HELPER_POSITIONS)]
+    helpers = (
+        ("is_note_on_line", note_helpers.is_note_on_line),
+        ("is_head_on_line", note_helpers.is_head_on_line),
+        ("is_note_in_space", note_helpers.is_note_in_space),
+        ("is_note_outside_staff", note_helpers.is_note_outside_staff),
+        ("is_note_on_supplementary_line", note_helpers.is_note_on_supplementary_line),
+        ("get_supplementary_lines", note_helpers.get_supplementary_lines),
+    )
+    
+    results = []
+    for name, helper in helpers:
+        def run():
+            for y in positions:
+                helper(y, y_staff)
+        
+        stats, _ = measure(run, repeat)
+        stats.update({
+            "name": f"note_helpers.{name}",
+            "params": {"positions": len(positions)},
+            "calls_per_second": len(positions) / stats["wall_seconds"],
+        })
+        results.append(stats)
+    return results
+
+
+def bench_sampling(repeat):
+    from src.core import sampling
+    
+    quantity, notes_per_staff = 6, 17
+    num_pages = -(-SAMPLING_NOTES // (quantity * notes_per_staff))
+    
+    results = []
+    for name, constraints in SAMPLING_CONSTRAINTS:
+        def run():
+            return sampling.sample_document(settings.DEFAULT_SEQUENCE, quantity, num_pages,
+                                            notes_per_staff, 1, constraints).size
+        
+        stats, notes = measure(run, repeat)
+        stats.update({
+            "name": "sampling.sample_document",
+            "params": {"constraints": name, "notes": notes},
+            "notes_per_second": notes / stats["wall_seconds"],
+        })
+        results.append(stats)
+    return results
+
+
+def bench_preview(repeat):
+    import tempfile
+    from collections import OrderedDict
+    from types import SimpleNamespace
+    from PIL import Image
+    from src.core.pdf_generator import PautaPDFGenerator
+    from src.core.preview_worker import PREVIEW_ZOOM, preview_page_keys, render_preview, render_preview_page
+    from src.gui.widgets import PDFPreviewCanvas, THUMBNAIL_ZOOM
+    
+    pdf_bytes = PautaPDFGenerator().generate_bytes(settings.DEFAULT_SEQUENCE, 6, RASTER_PAGES,
+                                                   random_mode=True, notes_per_staff=17, seed=1)
+    
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, "pauta.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(pdf_bytes)
+        
+        def document_pages():
+            documents = OrderedDict()
+            images = []
+            try:
+                for _, rendered in render_preview({"pdf_path": pdf_path, "num_pages": RASTER_PAGES},
+                                                  SimpleNamespace(value=1), 1, documents=documents,
+                                                  width=PREVIEW_WIDTH):
+                    images.extend(PDFPreviewCanvas._samples_to_image(*samples)
+                                  for samples in rendered.values())
+            finally:
+                for doc in documents.values():
+                    doc.close()
+            return images
+        
+        stats, images = measure(document_pages, repeat)
+    stats.update({
+        "name": "preview.document_pages",
+        "params": {"pages": RASTER_PAGES, "width": PREVIEW_WIDTH},
+        "pdf_bytes": len(pdf_bytes),
+        "pages_per_second": RASTER_PAGES / stats["wall_seconds"],
+    })
+    results.append(stats)
+    
+    image = images[0]
+    display_size = (500, round(500 * image.height / image.width))
+    for resample in ("LANCZOS", "BILINEAR"):
+        def resize():
+            return image.resize(display_size, getattr(Image.Resampling, resample))
+        
+        stats, _ = measure(resize, repeat)
+        stats.update({
+            "name": "preview.resize",
+            "params": {"resample": resample, "size": list(display_size)},
+        })
+        results.append(stats)
+    
+    page_params, _ = preview_page_keys(dict(
+        notes_sequence=settings.DEFAULT_SEQUENCE, quantity=6, num_pages=1,
+        staff_gap_cm=4.0, random_mode=True, notes_per_staff=17, seed=1,
+    ))
+    generator = PautaPDFGenerator()
+    
+    def render_page():
+        return list(render_preview_page(page_params, 0, generator, {}))
+    
+    stats, _ = measure(render_page, repeat)
+    stats.update({
+        "name": "preview.render_page",
+        "params": {"zoom": PREVIEW_ZOOM},
+    })
+    results.append(stats)
+    
+    thumbnail_generator = PautaPDFGenerator(output_profile="compacto")
+    
+    def render_thumbnail():
+        return list(render_preview_page(page_params, 0, thumbnail_generator, {}, THUMBNAIL_ZOOM))
+    
+    stats, _ = measure(render_thumbnail, repeat)
+    stats.update({
+        "name": "preview.render_thumbnail",
+        "params": {"zoom": round(THUMBNAIL_ZOOM, 3), "profile": "compacto"},
+    })
+    results.append(stats)
+    return results
+
+
+def bench_raster(repeat):
+    import tempfile
+    from src.core.raster_export import export_raster
+    
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for image_format, color in (("png", "rgb"), ("tiff", "cinza"), ("tiff", "1bit")):
+            for workers in dict.fromkeys((1, os.cpu_count() or 1)):
+                output_path = os.path.join(temp_dir, f"pauta.{image_format}")
+                
+                def run():
+                    paths = export_raster(output_path, settings.DEFAULT_SEQUENCE, 6, RASTER_PAGES,
+                                          random_mode=True, notes_per_staff=17, seed=1,
+                                          image_format=image_format, color=color, workers=workers)
+                    return sum(os.path.getsize(path) for path in paths)
+                
+                stats, image_bytes = measure(run, repeat)
+                stats.update({
+                    "name": "raster.export",
+                    "params": {"format": image_format, "color": color, "workers": workers, "pages": RASTER_PAGES},
+                    "image_bytes": image_bytes,
+                    "pages_per_second": RASTER_PAGES / stats["wall_seconds"],
+                })
+                results.append(stats)
+    return results
+
+
+def environment():
+    versions = {"python": platform.python_version()}
+    for module_name, attribute in (("reportlab", "Version"), ("fitz", "VersionBind"), ("PIL", "__version__")):
+        try:
+            module = __import__(module_name)
+            versions[module_name] = getattr(module, attribute, None)
+        except ImportError:
+            versions[module_name] = None
+    
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "versions": versions,
+    }
+
+
+def _case_id(result):
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def report(results, baseline=None, out=print):
+    previous = {}
+    if baseline:
+        previous = {_case_id(r): r for r in baseline.get("results", [])}
+    
+    for result in results:
+        line = (f"{_case_id(result):70s} {result['wall_seconds'] * 1000:10.2f} ms "
+                f"{result['peak_bytes'] / 1024:10.0f} KB")
+        if "pdf_bytes" in result:
+            line += f" {result['pdf_bytes'] / 1024:8.0f} KB pdf"
+        old = previous.get(_case_id(result))
+        if old:
+            line += f"  x{result['wall_seconds'] / old['wall_seconds']:.2f}"
+        out(line)
+
+
+def run(groups, quick=False, repeat=3):
+    page_counts = QUICK_PAGE_COUNTS if quick else PAGE_COUNTS
+    results = []
+    if "generate" in groups:
+        results.extend(bench_generate(page_counts, repeat))
+    if "profiles" in groups:
+        results.extend(bench_profiles(page_counts, repeat))
+    if "helpers" in groups:
+        results.extend(bench_note_helpers(repeat))
+    if "sampling" in groups:
+        results.extend(bench_sampling(repeat))
+    if "preview" in groups:
+        results.extend(bench_preview(repeat))
+    if "raster" in groups:
+        results.extend(bench_raster(repeat))
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Mede o desempenho do gerador, das funções auxiliares e do preview, e grava os resultados em JSON."
+    )
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT,
+                        help=f"arquivo JSON de saída (padrão: {DEFAULT_OUTPUT})")
+    parser.add_argument("--only", nargs="+", choices=("generate", "profiles", "helpers", "sampling", "preview", "raster"),
+                        default=("generate", "profiles", "helpers", "sampling", "preview", "raster"),
+                        help="grupos de medições a executar")
+    parser.add_argument("--quick", action="store_true",
+                        help="pula os casos de 1000 páginas")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="repetições por caso (vale o menor tempo)")
+    parser.add_argument("--baseline", default=None,
+                        help="JSON de uma execução anterior para comparar os tempos")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    
+    results = run(args.only, quick=args.quick, repeat=max(1, args.repeat))
+    report(results, baseline)
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"\nResultados gravados em {args.output}")
+    return 0
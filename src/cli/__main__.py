@@ -0,0 +1,6 @@
+import sys
+
+from src.cli.batch import main
+
+
+sys.exit(main())
@@ -0,0 +1,314 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.config import settings
+from src.core.pdf_cache import PDFCache, default_cache_dir, normalize_params, is_cacheable
+from src.core import layout, pitch
+from src.core.pdf_generator import PautaPDFGenerator, OUTPUT_PROFILES
+from src.core.raster_export import RasterExporter, COLOR_MODES
+from src.core.sampling import normalize_constraints
+from src.core.svg_renderer import SVGRenderer
+
+
+JOB_DEFAULTS = {
+    "notes": None,
+    "quantity": 6,
+    "staff_gap": 5.0,
+    "pages": 1,
+    "notes_per_staff": 17,
+    "mode": "sequencial",
+    "seed": None,
+    "format": "pdf",
+    "dpi": 150,
+    "color": "rgb",
+    "weights": None,
+    "no_repeat": False,
+    "max_interval": None,
+    "cover_strings": False,
+    "profile": "padrao",
+    "optimize": False,
+}
+
+VALID_MODES = ("sequencial", "aleatorio")
+
+VALID_FORMATS = ("pdf", "svg", "png", "tiff")
+
+
+def parse_notes(value):
+    if value is None:
+        return list(settings.DEFAULT_SEQUENCE)
+    
+    if isinstance(value, str):
+        value = [part for part in re.split(r"[\s,;]+", value) if part]
+    
+    if not value or value == ["todas"]:
+        return list(settings.DEFAULT_SEQUENCE)
+    
+    unknown = [note for note in value if note not in settings.NOTE_POSITIONS]
+    if unknown:
+        raise ValueError(f"Notas desconhecidas: {', '.join(unknown)}")
+    
+    return list(value)
+
+
+def parse_weights(value):
+    if value is None or isinstance(value, dict):
+        return value
+    
+    weights = {}
+    for part in re.split(r"[\s,;]+", str(value)):
+        if not part:
+            continue
+        note, separator, weight = part.partition(":")
+        if not separator:
+            raise ValueError(f"Peso inválido: {part} (use 'Nota:peso')")
+        weights[note] = float(weight)
+    return weights
+
+
+def parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "sim", "s", "yes", "y")
+    return bool(value)
+
+
+def _optional(value):
+    if value is None:
+        return None
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def _number(value, kind, name):
+    if isinstance(value, bool):
+        raise ValueError(f"Valor inválido para '{name}': {value}")
+    return kind(value)
+
+
+def normalize_job(raw, require_output=True):
+    job = dict(JOB_DEFAULTS)
+    for key, value in raw.items():
+        value = _optional(value)
+        if value is not None:
+            job[key] = value
+    
+    output = job.get("output")
+    if not output and require_output:
+        raise ValueError("Trabalho sem caminho de saída ('output')")
+    
+    mode = str(job["mode"]).strip().lower()
+    if mode not in VALID_MODES:
+        raise ValueError(f"Modo inválido: {job['mode']} (use 'sequencial' ou 'aleatorio')")
+    
+    quantity = _number(job["quantity"], int, "quantity")
+    if not 1 <= quantity <= settings.MAX_STAFFS_PER_PAGE:
+        raise ValueError(f"Quantidade de pautas deve estar entre 1 e {settings.MAX_STAFFS_PER_PAGE}")
+    
+    pages = _number(job["pages"], int, "pages")
+    if pages < 1:
+        raise ValueError("O número de páginas deve ser pelo menos 1")
+    
+    notes_per_staff = _number(job["notes_per_staff"], int, "notes_per_staff")
+    if not 1 <= notes_per_staff <= settings.MAX_NOTES_PER_STAFF:
+        raise ValueError(f"O número de notas por pauta deve estar entre 1 e {settings.MAX_NOTES_PER_STAFF}")
+    
+    staff_gap = _number(job["staff_gap"], float, "staff_gap")
+    if not settings.MIN_STAFF_GAP_CM <= staff_gap <= settings.MAX_STAFF_GAP_CM:
+        raise ValueError(f"O espaçamento entre pautas deve estar entre {settings.MIN_STAFF_GAP_CM:g} "
+                         f"e {settings.MAX_STAFF_GAP_CM:g} cm")
+    
+    dpi = _number(job["dpi"], int, "dpi")
+    if not settings.MIN_DPI <= dpi <= settings.MAX_DPI:
+        raise ValueError(f"A resolução deve estar entre {settings.MIN_DPI} e {settings.MAX_DPI} dpi")
+    
+    output_format = str(job["format"]).strip().lower()
+    if output_format not in VALID_FORMATS:
+        raise ValueError(f"Formato inválido: {job['format']} (use 'pdf', 'svg', 'png' ou 'tiff')")
+    
+    color = str(job["color"]).strip().lower()
+    if color not in COLOR_MODES:
+        raise ValueError(f"Cor inválida: {job['color']} (use 'rgb', 'cinza' ou '1bit')")
+    
+    profile = str(job["profile"]).strip().lower()
+    if profile not in OUTPUT_PROFILES:
+        raise ValueError(f"Perfil inválido: {job['profile']} (use 'padrao' ou 'compacto')")
+    
+    seed = job["seed"]
+    
+    constraints = normalize_constraints({
+        "weights": parse_weights(job["weights"]),
+        "no_repeat": parse_bool(job["no_repeat"]),
+        "max_interval": job["max_interval"],
+        "cover_strings": parse_bool(job["cover_strings"]),
+    })
+    
+    return {
+        "notes": parse_notes(job["notes"]),
+        "quantity": quantity,
+        "staff_gap": staff_gap,
+        "pages": pages,
+        "notes_per_staff": notes_per_staff,
+        "mode": mode,
+        "seed": _number(seed, int, "seed") if seed is not None else None,
+        "output": str(output) if output else None,
+        "format": output_format,
+        "dpi": dpi,
+        "color": color,
+        "constraints": constraints,
+        "profile": profile,
+        "optimize": parse_bool(job["optimize"]),
+    }
+
+
+def load_jobs(path):
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            raw_jobs = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        raw_jobs = data["jobs"] if isinstance(data, dict) else data
+    
+    jobs = []
+    for index, raw in enumerate(raw_jobs, start=1):
+        try:
+            jobs.append(normalize_job(raw))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Trabalho {index}: {e}") from e
+    return jobs
+
+
+_worker_cache = None
+
+
+def _get_worker_cache(cache_dir):
+    global _worker_cache
+    if _worker_cache is None or _worker_cache.cache_dir != cache_dir:
+        _worker_cache = PDFCache(cache_dir)
+    return _worker_cache
+
+
+def job_params(job):
+    return dict(
+        notes_sequence=pitch.encode(job["notes"]),
+        quantity=job["quantity"],
+        num_pages=job["pages"],
+        staff_gap_cm=job["staff_gap"],
+        random_mode=(job["mode"] == "aleatorio"),
+        notes_per_staff=job["notes_per_staff"],
+        seed=job["seed"],
+        constraints=job["constraints"],
+    )
+
+
+def generator_options(job):
+    return dict(output_profile=job["profile"], optimize=job["optimize"])
+
+
+def run_job(job, cache_dir=None):
+    output_dir = os.path.dirname(os.path.abspath(job["output"]))
+    os.makedirs(output_dir, exist_ok=True)
+    
+    params = job_params(job)
+    
+    start = time.perf_counter()
+    if job["format"] != "pdf":
+        _render_pages(job, params)
+        return time.perf_counter() - start, None
+    
+    generator = PautaPDFGenerator(**generator_options(job))
+    if cache_dir and is_cacheable(normalize_params(**params)):
+        hit = _get_worker_cache(cache_dir).generate(generator, job["output"], **params)
+    else:
+        generator.generate(output_path=job["output"], **params)
+        hit = None
+    return time.perf_counter() - start, hit
+
+
+def _render_pages(job, params):
+    if job["format"] == "svg":
+        page_layouts = layout.iter_page_layouts(**params)
+        SVGRenderer().render(page_layouts, job["output"])
+        return
+    
+    exporter = RasterExporter(PautaPDFGenerator(**generator_options(job)), dpi=job["dpi"],
+                              image_format=job["format"], color=job["color"], workers=1)
+    exporter.generate(output_path=job["output"], **params)
+
+
+def run_batch(jobs, workers=None, cache_dir=None, report=print):
+    results = []
+    start = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_job, job, cache_dir): index for index, job in enumerate(jobs)}
+        
+        for done, future in enumerate(as_completed(futures), start=1):
+            job = jobs[futures[future]]
+            try:
+                seconds, hit = future.result()
+                error = None
+                report(f"[{done}/{len(jobs)}] {job['output']}: "
+                       f"{job['pages']} pág. em {seconds:.3f}s"
+                       f"{' (cache)' if hit else ''}")
+            except Exception as e:
+                seconds, hit = None, None
+                error = str(e)
+                report(f"[{done}/{len(jobs)}] {job['output']}: ERRO - {error}")
+            results.append({"job": job, "seconds": seconds, "cache_hit": hit, "error": error})
+    
+    elapsed = time.perf_counter() - start
+    ok = [r for r in results if r["error"] is None]
+    total_pages = sum(r["job"]["pages"] for r in ok)
+    
+    report("")
+    report(f"Trabalhos: {len(ok)} concluídos, {len(results) - len(ok)} com erro")
+    report(f"Páginas: {total_pages}")
+    if cache_dir:
+        hits = sum(1 for r in ok if r["cache_hit"] is True)
+        misses = sum(1 for r in ok if r["cache_hit"] is False)
+        report(f"Cache: {hits} acertos, {misses} faltas, {len(ok) - hits - misses} sem cache")
+    report(f"Tempo total: {elapsed:.3f}s")
+    if elapsed > 0:
+        report(f"Vazão: {len(ok) / elapsed:.2f} trabalhos/s, {total_pages / elapsed:.1f} páginas/s")
+    
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Gera pautas em lote, sem interface gráfica, a partir de um arquivo de trabalhos (JSON ou CSV)."
+    )
+    parser.add_argument("jobs_file", help="arquivo .json ou .csv com a lista de trabalhos")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument("--cache-dir", default=None,
+                        help="diretório do cache de PDFs (padrão: cache do usuário)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="não usar o cache de PDFs")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    try:
+        jobs = load_jobs(args.jobs_file)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Erro ao ler trabalhos: {e}")
+        return 2
+    
+    if not jobs:
+        print("Nenhum trabalho encontrado.")
+        return 0
+    
+    cache_dir = None if args.no_cache else (args.cache_dir or default_cache_dir())
+    results = run_batch(jobs, workers=args.workers, cache_dir=cache_dir)
+    return 0 if all(r["error"] is None for r in results) else 1
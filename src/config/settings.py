@@ -1,5 +1,13 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
+import os
+
+inch = 72.0
+cm = inch / 2.54
+mm = cm * 0.1
+A4 = (210 * mm, 297 * mm)
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets")
+CLEF_IMAGE_PATH = os.path.join(ASSETS_DIR, "clave_de_sol.png")
+COMPACT_CLEF_DPI = 300
 
 PAGE_SIZE = A4
 PAGE_WIDTH, PAGE_HEIGHT = A4
@@ -33,6 +41,12 @@ BARLINE_X = X_START + STAFF_WIDTH
 
 MAX_STAFFS_PER_PAGE = 6
 
+MAX_NOTES_PER_STAFF = 17
+
+MIN_STAFF_GAP_CM, MAX_STAFF_GAP_CM = 3.0, 20.0
+
+MIN_DPI, MAX_DPI = 72, 600
+
 CLEF_WIDTH_PT = 70
 available_width_for_notes = STAFF_WIDTH - CLEF_WIDTH_PT - 0.3 * cm
 NOTE_X_SPACING = available_width_for_notes / 17
@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core import layout, pitch
+from src.core.files import replace_file
+from src.core.pdf_generator import PautaPDFGenerator, optimize_pdf_file
+
+
+DEFAULT_CHUNK_PAGES = 250
+
+MIN_PARALLEL_CHUNK_PAGES = 200
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    
+    def __init__(self):
+        self._event = threading.Event()
+    
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+    
+    def cancel(self):
+        self._event.set()
+    
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ExportCancelled()
+
+
+class StreamingPDFExporter:
+    
+    def __init__(self, generator=None, chunk_pages=DEFAULT_CHUNK_PAGES):
+        self.generator = generator or PautaPDFGenerator()
+        self.chunk_pages = max(1, int(chunk_pages))
+    
+    def cache_signature(self):
+        return self.generator.cache_signature()
+    
+    def generate(self, notes_sequence, quantity, output_path, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, progress=None, cancel_token=None, constraints=None):
+        if not notes_sequence:
+            raise ValueError("Nenhuma nota selecionada para gerar o PDF")
+        
+        seed = layout.resolve_seed(seed)
+        page_args = (pitch.encode(notes_sequence), quantity, staff_gap_cm, random_mode, notes_per_staff, seed, constraints)
+        
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=output_dir)
+        os.close(temp_fd)
+        try:
+            first_end = min(num_pages, self.chunk_pages)
+            self.generator.render(
+                self._page_layouts(page_args, 0, first_end, num_pages, progress, cancel_token),
+                temp_path
+            )
+            
+            for start in range(first_end, num_pages, self.chunk_pages):
+                end = min(num_pages, start + self.chunk_pages)
+                chunk = self.generator.render_bytes(
+                    self._page_layouts(page_args, start, end, num_pages, progress, cancel_token)
+                )
+                self._append_chunk(temp_path, chunk)
+            
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if self.generator.optimize and num_pages > first_end:
+                optimize_pdf_file(temp_path)
+            replace_file(temp_path, output_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _page_layouts(self, page_args, start, end, total, progress, cancel_token):
+        notes_sequence, quantity, staff_gap_cm, random_mode, notes_per_staff, seed, constraints = page_args
+        for page in range(start, end):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            yield layout.layout_page(notes_sequence, quantity, page, staff_gap_cm,
+                                     random_mode, notes_per_staff, seed, constraints=constraints)
+            if progress is not None:
+                progress(page + 1, total)
+    
+    @staticmethod
+    def _append_chunk(path, chunk):
+        import fitz
+        
+        source = fitz.open(stream=chunk, filetype="pdf")
+        try:
+            target = fitz.open(path)
+            try:
+                target.insert_pdf(source)
+                target.saveIncr()
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+
+def _render_chunk(generator_signature, page_args, start, end):
+    generator = PautaPDFGenerator(**generator_signature)
+    notes_sequence, quantity, staff_gap_cm, random_mode, notes_per_staff, seed, constraints = page_args
+    return generator.render_bytes(
+        layout.layout_page(notes_sequence, quantity, page, staff_gap_cm,
+                           random_mode, notes_per_staff, seed, constraints=constraints)
+        for page in range(start, end)
+    )
+
+
+class ParallelPDFExporter(StreamingPDFExporter):
+    
+    def __init__(self, generator=None, chunk_pages=DEFAULT_CHUNK_PAGES, workers=None, min_chunk_pages=MIN_PARALLEL_CHUNK_PAGES):
+        super().__init__(generator, chunk_pages)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_chunk_pages = max(1, int(min_chunk_pages))
+    
+    def generate(self, notes_sequence, quantity, output_path, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, progress=None, cancel_token=None, constraints=None):
+        chunk_pages = max(self.min_chunk_pages, min(self.chunk_pages, -(-num_pages // self.workers)))
+        if self.workers <= 1 or num_pages < 2 * chunk_pages:
+            super().generate(notes_sequence, quantity, output_path, num_pages,
+                             staff_gap_cm=staff_gap_cm, random_mode=random_mode,
+                             notes_per_staff=notes_per_staff, seed=seed,
+                             progress=progress, cancel_token=cancel_token,
+                             constraints=constraints)
+            return
+        
+        if not notes_sequence:
+            raise ValueError("Nenhuma nota selecionada para gerar o PDF")
+        
+        seed = layout.resolve_seed(seed)
+        page_args = (pitch.encode(notes_sequence), quantity, staff_gap_cm, random_mode, notes_per_staff, seed, constraints)
+        chunks = [(start, min(num_pages, start + chunk_pages))
+                  for start in range(0, num_pages, chunk_pages)]
+        workers = min(self.workers, len(chunks))
+        signature = dict(self.generator.cache_signature(), optimize=False)
+        
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=output_dir)
+        os.close(temp_fd)
+        try:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                pending = []
+                next_chunk = 0
+                try:
+                    for index, (start, end) in enumerate(chunks):
+                        while next_chunk < len(chunks) and len(pending) < 2 * workers:
+                            chunk_start, chunk_end = chunks[next_chunk]
+                            pending.append(executor.submit(_render_chunk, signature, page_args,
+                                                           chunk_start, chunk_end))
+                            next_chunk += 1
+                        
+                        chunk = pending.pop(0).result()
+                        if cancel_token is not None:
+                            cancel_token.raise_if_cancelled()
+                        
+                        if index == 0:
+                            with open(temp_path, "wb") as f:
+                                f.write(chunk)
+                        else:
+                            self._append_chunk(temp_path, chunk)
+                        
+                        if progress is not None:
+                            progress(end, num_pages)
+                finally:
+                    for future in pending:
+                        future.cancel()
+            
+            if self.generator.optimize:
+                optimize_pdf_file(temp_path)
+            replace_file(temp_path, output_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+
+def export_pdf(output_path, notes_sequence, quantity, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, progress=None, cancel_token=None, generator=None, chunk_pages=DEFAULT_CHUNK_PAGES, workers=1, constraints=None):
+    if workers == 1:
+        exporter = StreamingPDFExporter(generator, chunk_pages)
+    else:
+        exporter = ParallelPDFExporter(generator, chunk_pages, workers)
+    exporter.generate(notes_sequence, quantity, output_path, num_pages,
+                      staff_gap_cm=staff_gap_cm, random_mode=random_mode,
+                      notes_per_staff=notes_per_staff, seed=seed,
+                      progress=progress, cancel_token=cancel_token, constraints=constraints)
@@ -0,0 +1,15 @@
+import os
+
+
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+DEFAULT_FILE_MODE = 0o666 & ~_current_umask()
+
+
+def replace_file(temp_path, path):
+    os.chmod(temp_path, DEFAULT_FILE_MODE)
+    os.replace(temp_path, path)
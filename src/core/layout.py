@@ -0,0 +1,189 @@
+import os
+import random
+from array import array
+
+from src.config import settings
+from src.config.settings import cm
+from src.core import pitch
+
+
+class PageLayout:
+    
+    __slots__ = (
+        "page_index", "staff_y", "clef_boxes",
+        "head_x", "head_y", "head_filled", "head_start",
+        "ledger_x1", "ledger_x2", "ledger_y", "ledger_start",
+    )
+    
+    def __init__(self, page_index):
+        self.page_index = page_index
+        self.staff_y = array("d")
+        self.clef_boxes = []
+        self.head_x = array("d")
+        self.head_y = array("d")
+        self.head_filled = array("B")
+        self.head_start = array("I", [0])
+        self.ledger_x1 = array("d")
+        self.ledger_x2 = array("d")
+        self.ledger_y = array("d")
+        self.ledger_start = array("I", [0])
+    
+    @property
+    def staff_count(self):
+        return len(self.staff_y)
+    
+    @property
+    def head_count(self):
+        return len(self.head_x)
+    
+    def staff_heads(self, staff_index):
+        return range(self.head_start[staff_index], self.head_start[staff_index + 1])
+    
+    def staff_ledgers(self, staff_index):
+        return range(self.ledger_start[staff_index], self.ledger_start[staff_index + 1])
+    
+    def add_staff(self, y_staff, positions):
+        self.staff_y.append(y_staff)
+        self.clef_boxes.append(clef_box(y_staff))
+        
+        half_line_length = settings.SUPPLEMENTARY_LINE_LENGTH // 2
+        ledger_offsets = pitch.PITCH_LEDGER_OFFSETS
+        head_filled = pitch.PITCH_HEAD_FILLED
+        
+        for x_note, y_note, code in positions:
+            for offset in ledger_offsets[code]:
+                self.ledger_x1.append(x_note - half_line_length)
+                self.ledger_x2.append(x_note + half_line_length)
+                self.ledger_y.append(y_staff + offset)
+            
+            self.head_x.append(x_note)
+            self.head_y.append(y_note)
+            self.head_filled.append(head_filled[code])
+        
+        self.head_start.append(len(self.head_x))
+        self.ledger_start.append(len(self.ledger_y))
+
+
+def staff_gap_points(staff_gap_cm):
+    if staff_gap_cm is not None:
+        return staff_gap_cm * cm
+    return 4 * cm
+
+
+def resolve_seed(seed):
+    if seed is None:
+        return random.randrange(2 ** 32)
+    return seed
+
+
+def build_staff_notes(notes_sequence, notes_per_staff):
+    notes_sequence = pitch.encode(notes_sequence)
+    target_notes_count = notes_per_staff
+    current_staff_notes = notes_sequence * (target_notes_count // len(notes_sequence))
+    current_staff_notes.extend(notes_sequence[:target_notes_count % len(notes_sequence)])
+    return current_staff_notes
+
+
+def note_positions(notes, y_staff, notes_per_staff):
+    clef_width_pt = 70
+    clef_x_offset = -0.5 * cm
+    clef_start = settings.X_START + clef_x_offset
+    clef_end = clef_start + clef_width_pt
+    
+    note_start = clef_end + 0.05 * cm
+    
+    margin_before_bar = 0.3 * cm
+    
+    last_note_center_x = settings.BARLINE_X - margin_before_bar - settings.NOTE_RADIUS
+    note_spacing = (last_note_center_x - note_start) / (notes_per_staff - 1) if notes_per_staff > 1 else 0
+    
+    positions = []
+    x = note_start
+    
+    max_x = settings.BARLINE_X - margin_before_bar
+    offsets = pitch.PITCH_OFFSETS
+    
+    for code in notes:
+        if x + settings.NOTE_RADIUS > max_x:
+            break
+        
+        positions.append((x, y_staff + offsets[code], code))
+        x += note_spacing
+    
+    return positions
+
+
+def clef_box(y_staff):
+    line2_y = y_staff + 10
+    
+    clef_height = 70
+    clef_width = 70
+    
+    clef_x = settings.X_START - 0.5 * cm
+    
+    clef_y = line2_y - (clef_height / 2) + 7
+    
+    return clef_x, clef_y, clef_width, clef_height
+
+
+def sample_page_notes(notes_sequence, quantity, page, random_mode=True, notes_per_staff=15, seed=0, constraints=None):
+    if not notes_sequence:
+        raise ValueError("Nenhuma nota selecionada para gerar o PDF")
+    
+    notes_sequence = pitch.encode(notes_sequence)
+    if not random_mode:
+        return [build_staff_notes(notes_sequence, notes_per_staff)] * quantity
+    
+    from src.core import sampling
+    
+    return sampling.sample_page(notes_sequence, quantity, page, notes_per_staff, seed, constraints).tolist()
+
+
+def sampling_key(notes_sequence, quantity, page, random_mode=True, notes_per_staff=15, seed=0, constraints=None):
+    if not random_mode:
+        return (pitch.sequence_key(notes_sequence), quantity, notes_per_staff, False)
+    
+    from src.core import sampling
+    
+    return (pitch.sequence_key(notes_sequence), quantity, notes_per_staff, True, seed, page,
+            sampling.constraints_key(constraints))
+
+
+def page_key(notes_sequence, quantity, page, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=0, constraints=None):
+    key = sampling_key(notes_sequence, quantity, page, random_mode, notes_per_staff, seed, constraints)
+    return key + (staff_gap_points(staff_gap_cm),)
+
+
+def layout_page(notes_sequence, quantity, page, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=0, staff_notes=None, constraints=None):
+    if staff_notes is None:
+        staff_notes = sample_page_notes(notes_sequence, quantity, page, random_mode, notes_per_staff,
+                                        seed, constraints)
+    
+    staff_gap = staff_gap_points(staff_gap_cm)
+    
+    page_layout = PageLayout(page)
+    for staff_index, current_staff_notes in enumerate(staff_notes):
+        y_staff = settings.Y_START - staff_index * staff_gap
+        
+        page_layout.add_staff(y_staff, note_positions(current_staff_notes, y_staff, notes_per_staff))
+    return page_layout
+
+
+def iter_page_layouts(notes_sequence, quantity, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, constraints=None):
+    notes_sequence = pitch.encode(notes_sequence)
+    seed = resolve_seed(seed)
+    for page in range(num_pages):
+        yield layout_page(notes_sequence, quantity, page, staff_gap_cm,
+                          random_mode, notes_per_staff, seed, constraints=constraints)
+
+
+def layout_document(notes_sequence, quantity, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, constraints=None):
+    return list(iter_page_layouts(notes_sequence, quantity, num_pages, staff_gap_cm,
+                                  random_mode, notes_per_staff, seed, constraints))
+
+
+def page_output_path(output_path, page_index):
+    if "{page" in output_path:
+        return output_path.format(page=page_index + 1)
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_{page_index + 1:03d}{ext}"
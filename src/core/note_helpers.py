@@ -11,6 +11,11 @@ def is_note_on_line(y, y_staff, tolerance=2):
     return False, None
 
 
+def is_head_on_line(y, y_staff, tolerance=2):
+    remainder = abs((y - y_staff) % 10)
+    return (remainder < tolerance) or (remainder > (10 - tolerance))
+
+
 def is_note_in_space(y, y_staff, tolerance=2):
     if y < y_staff or y > y_staff + 40:
         return False, None
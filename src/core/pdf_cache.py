@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+from src.core import pitch
+from src.core.files import replace_file
+from src.core.sampling import normalize_constraints
+
+
+CACHE_FORMAT_VERSION = 3
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.environ.get("LOCALAPPDATA")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "gerador_pauta", "pdf")
+
+
+def normalize_params(notes_sequence, quantity, num_pages, staff_gap_cm=None,
+                     random_mode=True, notes_per_staff=15, seed=None, constraints=None):
+    if staff_gap_cm is None:
+        staff_gap_cm = 4.0
+    
+    return {
+        "notes": pitch.decode(pitch.encode(notes_sequence)),
+        "quantity": int(quantity),
+        "pages": int(num_pages),
+        "staff_gap_cm": round(float(staff_gap_cm), 6),
+        "random_mode": bool(random_mode),
+        "notes_per_staff": int(notes_per_staff),
+        "seed": int(seed) if (random_mode and seed is not None) else None,
+        "constraints": normalize_constraints(constraints) if random_mode else None,
+    }
+
+
+def is_cacheable(params):
+    return not params["random_mode"] or params["seed"] is not None
+
+
+def cache_key(params, generator_signature=None):
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "generator": generator_signature or {},
+        "params": params,
+    }
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=True)
+    return hashlib.sha256(data.encode("ascii")).hexdigest()
+
+
+class PDFCache:
+    
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def path_for_key(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+    
+    def generate(self, generator, output_path, notes_sequence, quantity, num_pages,
+                 staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None,
+                 constraints=None, **options):
+        params = normalize_params(notes_sequence, quantity, num_pages, staff_gap_cm,
+                                  random_mode, notes_per_staff, seed, constraints)
+        
+        if not is_cacheable(params):
+            self.bypasses += 1
+            generator.generate(notes_sequence, quantity, output_path, num_pages,
+                               staff_gap_cm=staff_gap_cm, random_mode=random_mode,
+                               notes_per_staff=notes_per_staff, seed=seed,
+                               constraints=constraints, **options)
+            return False
+        
+        cached_path, hit = self._fetch(generator, params, **options)
+        self._copy_atomic(cached_path, output_path)
+        return hit
+    
+    def generate_cached(self, generator, notes_sequence, quantity, num_pages,
+                        staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None,
+                        constraints=None):
+        params = normalize_params(notes_sequence, quantity, num_pages, staff_gap_cm,
+                                  random_mode, notes_per_staff, seed, constraints)
+        if not is_cacheable(params):
+            raise ValueError("O modo aleatório precisa de uma semente para usar o cache")
+        
+        cached_path, _ = self._fetch(generator, params)
+        return cached_path
+    
+    def _fetch(self, generator, params, **options):
+        key = cache_key(params, generator.cache_signature())
+        cached_path = self.path_for_key(key)
+        
+        try:
+            os.utime(cached_path)
+            self.hits += 1
+            return cached_path, True
+        except FileNotFoundError:
+            pass
+        
+        self.misses += 1
+        self._store(generator, params, cached_path, **options)
+        self._evict(keep=cached_path)
+        return cached_path, False
+    
+    def _store(self, generator, params, cached_path, **options):
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        os.close(temp_fd)
+        try:
+            generator.generate(
+                notes_sequence=params["notes"],
+                quantity=params["quantity"],
+                output_path=temp_path,
+                num_pages=params["pages"],
+                staff_gap_cm=params["staff_gap_cm"],
+                random_mode=params["random_mode"],
+                notes_per_staff=params["notes_per_staff"],
+                seed=params["seed"],
+                constraints=params["constraints"],
+                **options
+            )
+            replace_file(temp_path, cached_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _copy_atomic(self, source_path, output_path):
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=output_dir)
+        os.close(temp_fd)
+        try:
+            shutil.copyfile(source_path, temp_path)
+            replace_file(temp_path, output_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def _evict(self, keep=None):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+    
+    def size_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+    
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+
+class MemoryPDFCache:
+    
+    def __init__(self, max_bytes=DEFAULT_MEMORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+    
+    def generate_bytes(self, generator, notes_sequence, quantity, num_pages,
+                       staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None,
+                       constraints=None):
+        params = normalize_params(notes_sequence, quantity, num_pages, staff_gap_cm,
+                                  random_mode, notes_per_staff, seed, constraints)
+        
+        if not is_cacheable(params):
+            self.bypasses += 1
+            return generator.generate_bytes(notes_sequence, quantity, num_pages,
+                                            staff_gap_cm=staff_gap_cm, random_mode=random_mode,
+                                            notes_per_staff=notes_per_staff, seed=seed,
+                                            constraints=constraints)
+        
+        key = cache_key(params, generator.cache_signature())
+        data = self.get(key)
+        if data is not None:
+            return data
+        
+        data = generator.generate_bytes(
+            notes_sequence=params["notes"],
+            quantity=params["quantity"],
+            num_pages=params["pages"],
+            staff_gap_cm=params["staff_gap_cm"],
+            random_mode=params["random_mode"],
+            notes_per_staff=params["notes_per_staff"],
+            seed=params["seed"],
+            constraints=params["constraints"],
+        )
+        self.put(key, data)
+        return data
+    
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+    
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        
+        self._entries[key] = data
+        self._size += len(data)
+        
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+    
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
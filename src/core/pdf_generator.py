@@ -1,54 +1,157 @@
-import random
 import os
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
+import io
+from contextlib import contextmanager, nullcontext
+from reportlab import rl_config
+from reportlab.pdfgen import canvas, pathobject
+from reportlab.lib.utils import ImageReader
 
 from src.config import settings
-from src.core import note_helpers
+from src.core import layout
+from src.core.profiling import profiler, timed
+
+
+OUTPUT_PROFILES = ("padrao", "compacto")
+
+
+@contextmanager
+def _binary_streams():
+    previous = rl_config.useA85
+    rl_config.useA85 = 0
+    try:
+        yield
+    finally:
+        rl_config.useA85 = previous
+
+
+def optimize_pdf(data):
+    import fitz
+    
+    doc = fitz.open(stream=data, filetype="pdf")
+    try:
+        return doc.tobytes(garbage=4, deflate=True, use_objstms=1)
+    finally:
+        doc.close()
+
+
+def optimize_pdf_file(path):
+    with open(path, "rb") as f:
+        data = optimize_pdf(f.read())
+    with open(path, "wb") as f:
+        f.write(data)
 
 
 class PautaPDFGenerator:
     
-    def __init__(self):
-        script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        self.clef_image_path = os.path.join(script_dir, "assets", "clave_de_sol.png")
+    STAFF_FORM_NAME = "PautaStaff"
+    
+    def __init__(self, use_template=True, batch_notes=True, output_profile="padrao", optimize=False):
+        if output_profile not in OUTPUT_PROFILES:
+            raise ValueError(f"Perfil de saída inválido: {output_profile} (use 'padrao' ou 'compacto')")
+        
+        self.clef_image_path = settings.CLEF_IMAGE_PATH
+        self.use_template = use_template
+        self.batch_notes = batch_notes
+        self.output_profile = output_profile
+        self.optimize = optimize
+        self.compact = output_profile == "compacto"
+        self._path_code_cache = {}
+        self._clef_image = None
     
-    def generate(self, notes_sequence, quantity, output_path, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15):
+    @timed("pdf.generate")
+    def generate(self, notes_sequence, quantity, output_path, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, constraints=None):
         if not notes_sequence:
             raise ValueError("Nenhuma nota selecionada para gerar o PDF")
         
-        c = canvas.Canvas(output_path, pagesize=settings.PAGE_SIZE)
+        page_layouts = layout.iter_page_layouts(notes_sequence, quantity, num_pages, staff_gap_cm,
+                                                random_mode, notes_per_staff, seed, constraints)
+        self.render(page_layouts, output_path)
+    
+    def generate_page(self, notes_sequence, quantity, page, output_path, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=0, constraints=None):
+        page_layout = layout.layout_page(notes_sequence, quantity, page, staff_gap_cm,
+                                         random_mode, notes_per_staff, seed, constraints=constraints)
+        self.render([page_layout], output_path)
+    
+    def render(self, page_layouts, output_path):
+        if not self.optimize:
+            self._render(page_layouts, output_path)
+            return
+        
+        buffer = io.BytesIO()
+        self._render(page_layouts, buffer)
+        with profiler.span("pdf.optimize"):
+            data = optimize_pdf(buffer.getvalue())
         
-        if staff_gap_cm is not None:
-            staff_gap = staff_gap_cm * cm
+        if hasattr(output_path, "write"):
+            output_path.write(data)
         else:
-            staff_gap = 4 * cm
-        
-        for page in range(num_pages):
-            if page > 0:
-                c.showPage()
+            with open(output_path, "wb") as f:
+                f.write(data)
+    
+    def _render(self, page_layouts, output_path):
+        with _binary_streams() if self.compact else nullcontext():
+            c = canvas.Canvas(output_path, pagesize=settings.PAGE_SIZE,
+                              pageCompression=1 if self.compact else None)
+            self._path_code_cache = {}
             
-            for staff_index in range(quantity):
-                y_staff = settings.Y_START - staff_index * staff_gap
-                
-                target_notes_count = notes_per_staff
-                if random_mode:
-                    if len(notes_sequence) >= target_notes_count:
-                        current_staff_notes = random.sample(notes_sequence, target_notes_count)
-                    else:
-                        current_staff_notes = []
-                        while len(current_staff_notes) < target_notes_count:
-                            remaining = target_notes_count - len(current_staff_notes)
-                            current_staff_notes.extend(random.sample(notes_sequence, min(remaining, len(notes_sequence))))
-                else:
-                    current_staff_notes = notes_sequence * (target_notes_count // len(notes_sequence))
-                    current_staff_notes.extend(notes_sequence[:target_notes_count % len(notes_sequence)])
+            if self.use_template:
+                self._define_staff_form(c)
+            
+            for page_number, page_layout in enumerate(page_layouts):
+                if page_number > 0:
+                    c.showPage()
                 
-                self._draw_staff(c, y_staff)
-                self._draw_notes(c, current_staff_notes, y_staff, notes_per_staff)
+                self._draw_page(c, page_layout)
+            
+            with profiler.span("pdf.save"):
+                c.save()
+    
+    def render_bytes(self, page_layouts):
+        buffer = io.BytesIO()
+        self.render(page_layouts, buffer)
+        return buffer.getvalue()
+    
+    def generate_bytes(self, notes_sequence, quantity, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, constraints=None):
+        buffer = io.BytesIO()
+        self.generate(notes_sequence, quantity, buffer, num_pages,
+                      staff_gap_cm=staff_gap_cm, random_mode=random_mode,
+                      notes_per_staff=notes_per_staff, seed=seed, constraints=constraints)
+        return buffer.getvalue()
+    
+    def cache_signature(self):
+        return {
+            "use_template": self.use_template,
+            "batch_notes": self.batch_notes,
+            "output_profile": self.output_profile,
+            "optimize": self.optimize,
+        }
+    
+    def _draw_page(self, canvas_obj, page_layout):
+        if self.compact:
+            canvas_obj.setFillColorRGB(1, 1, 1)
         
-        c.save()
+        for staff_index in range(page_layout.staff_count):
+            y_staff = page_layout.staff_y[staff_index]
+            
+            with profiler.span("pdf.draw_staff"):
+                if self.use_template:
+                    self._place_staff_form(canvas_obj, y_staff)
+                else:
+                    self._draw_staff(canvas_obj, y_staff)
+            self._draw_notes(canvas_obj, page_layout, staff_index)
+    
+    @timed("pdf.staff_form")
+    def _define_staff_form(self, canvas_obj):
+        canvas_obj.beginForm(self.STAFF_FORM_NAME,
+                             lowerx=0, lowery=-40,
+                             upperx=settings.PAGE_WIDTH, uppery=80)
+        self._draw_staff(canvas_obj, 0)
+        canvas_obj.endForm()
+    
+    def _place_staff_form(self, canvas_obj, y_staff):
+        canvas_obj.saveState()
+        canvas_obj.translate(0, y_staff)
+        canvas_obj.doForm(self.STAFF_FORM_NAME)
+        canvas_obj.restoreState()
     
     def _draw_staff(self, canvas_obj, y_staff):
         for line in range(5):
@@ -61,25 +164,42 @@ class PautaPDFGenerator:
         
         self._draw_clef(canvas_obj, y_staff)
     
+    def _get_clef_image(self):
+        if self._clef_image is None:
+            if not os.path.exists(self.clef_image_path):
+                return None
+            if self.compact:
+                self._clef_image = ImageReader(self._compact_clef_image())
+            else:
+                with open(self.clef_image_path, "rb") as f:
+                    self._clef_image = ImageReader(io.BytesIO(f.read()))
+        return self._clef_image
+    
+    def _compact_clef_image(self):
+        from PIL import Image
+        
+        clef_width, clef_height = layout.clef_box(0)[2:]
+        scale = settings.COMPACT_CLEF_DPI / settings.inch
+        with Image.open(self.clef_image_path) as source:
+            image = source.convert("RGBA")
+        image.thumbnail((round(clef_width * scale), round(clef_height * scale)), Image.Resampling.LANCZOS)
+        
+        red, green, blue, alpha = image.split()
+        if red.tobytes() == green.tobytes() == blue.tobytes():
+            return Image.merge("LA", (red, alpha))
+        return image
+    
     def _draw_clef(self, canvas_obj, y_staff):
-        if not os.path.exists(self.clef_image_path):
+        clef_image = self._get_clef_image()
+        if clef_image is None:
             canvas_obj.line(settings.X_START, y_staff, settings.X_START, y_staff + 40)
             return
         
-        line1_y = y_staff
-        line2_y = y_staff + 10
-        line5_y = y_staff + 40
-        
-        clef_height = 70
-        clef_width = 70
-        
-        clef_x = settings.X_START - 0.5 * cm
-        
-        clef_y = line2_y - (clef_height / 2) + 7
+        clef_x, clef_y, clef_width, clef_height = layout.clef_box(y_staff)
         
         try:
             canvas_obj.drawImage(
-                self.clef_image_path,
+                clef_image,
                 clef_x,
                 clef_y,
                 width=clef_width,
@@ -91,58 +211,99 @@ class PautaPDFGenerator:
             print(f"Erro ao desenhar clave de sol: {e}")
             canvas_obj.line(settings.X_START, y_staff, settings.X_START, y_staff + 40)
     
-    def _draw_notes(self, canvas_obj, notes, y_staff, notes_per_staff):
-        from reportlab.lib.units import cm
-        clef_width_pt = 70
-        clef_x_offset = -0.5 * cm
-        clef_start = settings.X_START + clef_x_offset
-        clef_end = clef_start + clef_width_pt
-        
-        note_start = clef_end + 0.05 * cm
+    @timed("pdf.draw_notes")
+    def _draw_notes(self, canvas_obj, page_layout, staff_index):
+        if self.batch_notes:
+            self._draw_note_batch(canvas_obj, page_layout, staff_index)
+            return
         
-        margin_before_bar = 0.3 * cm
+        for i in page_layout.staff_ledgers(staff_index):
+            canvas_obj.line(page_layout.ledger_x1[i], page_layout.ledger_y[i],
+                            page_layout.ledger_x2[i], page_layout.ledger_y[i])
         
-        last_note_center_x = settings.BARLINE_X - margin_before_bar - settings.NOTE_RADIUS
-        note_spacing = (last_note_center_x - note_start) / (notes_per_staff - 1) if notes_per_staff > 1 else 0
+        for i in page_layout.staff_heads(staff_index):
+            self._draw_note(canvas_obj, page_layout.head_x[i], page_layout.head_y[i],
+                            page_layout.head_filled[i])
+    
+    def _draw_note_batch(self, canvas_obj, page_layout, staff_index):
+        heads = page_layout.staff_heads(staff_index)
+        if not heads:
+            return
         
-        note_positions = []
-        x = note_start
+        supp_code = ["n"]
+        fill_code = ["n"]
+        outline_code = ["n"]
         
-        max_x = settings.BARLINE_X - margin_before_bar
+        ledger_x1 = page_layout.ledger_x1
+        ledger_x2 = page_layout.ledger_x2
+        ledger_y = page_layout.ledger_y
+        for i in page_layout.staff_ledgers(staff_index):
+            supp_code.append(self._supplementary_line_code(ledger_x1[i], ledger_x2[i], ledger_y[i]))
         
-        for note in notes:
-            if note not in settings.NOTE_POSITIONS:
-                continue
+        head_x = page_layout.head_x
+        head_y = page_layout.head_y
+        head_filled = page_layout.head_filled
+        for i in heads:
+            circle_code = self._circle_code(head_x[i], head_y[i])
             
-            if x + settings.NOTE_RADIUS > max_x:
-                break
+            if head_filled[i]:
+                fill_code.append(circle_code)
+                if self.compact:
+                    continue
             
-            y = y_staff + settings.NOTE_POSITIONS[note]
-            note_positions.append((x, y, note))
-            x += note_spacing
+            outline_code.append(circle_code)
         
-        for x_note, y_note, note_name in note_positions:
-            self._draw_note(canvas_obj, x_note, y_note, y_staff)
-    
-    def _draw_note(self, canvas_obj, x_note, y_note, y_staff):
-        offset = y_note - y_staff
+        if len(supp_code) > 1:
+            canvas_obj.drawPath(pathobject.PDFPathObject(code=supp_code), stroke=1, fill=0)
         
-        is_outside = (offset < 0) or (offset > 40)
+        if self.compact:
+            if len(fill_code) > 1:
+                canvas_obj.drawPath(pathobject.PDFPathObject(code=fill_code), stroke=1, fill=1)
+            if len(outline_code) > 1:
+                canvas_obj.drawPath(pathobject.PDFPathObject(code=outline_code), stroke=1, fill=0)
+            return
         
-        remainder = abs(offset % 10)
-        is_on_line = (remainder < 2) or (remainder > 8)
+        if len(fill_code) > 1:
+            canvas_obj.setFillColorRGB(1, 1, 1)
+            canvas_obj.drawPath(pathobject.PDFPathObject(code=fill_code), stroke=0, fill=1)
+            canvas_obj.setFillColorRGB(0, 0, 0)
         
-        if is_outside:
-            supp_lines = note_helpers.get_supplementary_lines(y_note, y_staff)
-            half_line_length = settings.SUPPLEMENTARY_LINE_LENGTH // 2
-            for supp_line_y in supp_lines:
-                canvas_obj.line(x_note - half_line_length, supp_line_y, 
-                                x_note + half_line_length, supp_line_y)
+        canvas_obj.drawPath(pathobject.PDFPathObject(code=outline_code), stroke=1, fill=0)
+    
+    def _circle_code(self, x_note, y_note):
+        key = ("circle", x_note, y_note)
+        code = self._path_code_cache.get(key)
+        if code is None:
+            path = pathobject.PDFPathObject()
+            path.circle(x_note, y_note, settings.NOTE_RADIUS)
+            code = self._path_code_cache[key] = self._subpath_code(path)
+        return code
+    
+    def _supplementary_line_code(self, x1, x2, line_y):
+        key = ("line", x1, line_y)
+        code = self._path_code_cache.get(key)
+        if code is None:
+            path = pathobject.PDFPathObject()
+            path.moveTo(x1, line_y)
+            path.lineTo(x2, line_y)
+            code = self._path_code_cache[key] = self._subpath_code(path)
+        return code
+    
+    @staticmethod
+    def _subpath_code(path):
+        code = path.getCode()
+        if code.startswith("n "):
+            code = code[2:]
+        return code
+    
+    def _draw_note(self, canvas_obj, x_note, y_note, filled):
+        if self.compact:
+            canvas_obj.circle(x_note, y_note, settings.NOTE_RADIUS, stroke=1, fill=1 if filled else 0)
+            return
         
-        if not is_on_line:
+        if filled:
             canvas_obj.setFillColorRGB(1, 1, 1)
             canvas_obj.circle(x_note, y_note, settings.NOTE_RADIUS, stroke=0, fill=1)
             canvas_obj.setFillColorRGB(0, 0, 0)
         
         canvas_obj.circle(x_note, y_note, settings.NOTE_RADIUS, stroke=1, fill=0)
-
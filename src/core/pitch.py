@@ -0,0 +1,41 @@
+from array import array
+
+from src.config import settings
+from src.core import note_helpers
+
+
+PITCH_NAMES = tuple(sorted(settings.NOTE_POSITIONS, key=settings.NOTE_POSITIONS.get))
+
+PITCH_CODES = {name: code for code, name in enumerate(PITCH_NAMES)}
+
+PITCH_OFFSETS = array("d", (settings.NOTE_POSITIONS[name] for name in PITCH_NAMES))
+
+PITCH_HEAD_FILLED = array("B", (0 if note_helpers.is_head_on_line(offset, 0) else 1
+                                for offset in PITCH_OFFSETS))
+
+PITCH_LEDGER_OFFSETS = tuple(tuple(note_helpers.get_supplementary_lines(offset, 0))
+                             for offset in PITCH_OFFSETS)
+
+STRING_NAMES = tuple(settings.NOTES_BY_STRING)
+
+PITCH_STRINGS = array("B", (next((index for index, notes in enumerate(settings.NOTES_BY_STRING.values())
+                                  if name in notes), len(STRING_NAMES))
+                            for name in PITCH_NAMES))
+
+
+def encode(notes):
+    if isinstance(notes, array) and notes.typecode == "B":
+        return notes
+    
+    unknown = [note for note in notes if note not in PITCH_CODES]
+    if unknown:
+        raise ValueError(f"Notas desconhecidas: {', '.join(map(str, unknown))}")
+    return array("B", [PITCH_CODES[note] for note in notes])
+
+
+def decode(codes):
+    return [PITCH_NAMES[code] for code in codes]
+
+
+def sequence_key(notes):
+    return encode(notes).tobytes()
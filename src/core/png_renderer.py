@@ -0,0 +1,115 @@
+import os
+from PIL import Image, ImageDraw
+
+from src.config import settings
+from src.core import layout
+
+
+class PNGRenderer:
+    
+    def __init__(self, dpi=150, grayscale=False, supersample=2):
+        self.dpi = dpi
+        self.grayscale = grayscale
+        self.supersample = max(1, int(supersample))
+        self.clef_image_path = settings.CLEF_IMAGE_PATH
+        self._clef_source = None
+        self._clef_scaled = {}
+    
+    def render(self, page_layouts, output_path):
+        paths = []
+        for page_layout in page_layouts:
+            page_path = layout.page_output_path(output_path, page_layout.page_index)
+            self.render_page(page_layout).save(page_path, format="PNG")
+            paths.append(page_path)
+        return paths
+    
+    def page_size(self):
+        scale = self.dpi / 72.0
+        return round(settings.PAGE_WIDTH * scale), round(settings.PAGE_HEIGHT * scale)
+    
+    def render_page(self, page_layout):
+        mode = "L" if self.grayscale else "RGB"
+        black = 0 if self.grayscale else (0, 0, 0)
+        white = 255 if self.grayscale else (255, 255, 255)
+        
+        final_size = self.page_size()
+        scale = self.dpi / 72.0 * self.supersample
+        size = (final_size[0] * self.supersample, final_size[1] * self.supersample)
+        
+        image = Image.new(mode, size, white)
+        draw = ImageDraw.Draw(image)
+        line_width = max(1, round(scale))
+        
+        def to_x(x):
+            return x * scale
+        
+        def to_y(y):
+            return (settings.PAGE_HEIGHT - y) * scale
+        
+        staff_left = to_x(settings.X_START)
+        staff_right = to_x(settings.X_START + settings.STAFF_WIDTH)
+        barline_x = to_x(settings.BARLINE_X)
+        radius = settings.NOTE_RADIUS * scale
+        
+        for staff_index in range(page_layout.staff_count):
+            y_staff = page_layout.staff_y[staff_index]
+            
+            for line in range(5):
+                line_y = to_y(y_staff + line * 10)
+                draw.line([(staff_left, line_y), (staff_right, line_y)], fill=black, width=line_width)
+            
+            draw.line([(barline_x, to_y(y_staff)), (barline_x, to_y(y_staff + 40))],
+                      fill=black, width=line_width)
+            
+            self._draw_clef(image, draw, y_staff, page_layout.clef_boxes[staff_index],
+                            scale, to_x, to_y, black, line_width)
+            
+            for i in page_layout.staff_ledgers(staff_index):
+                line_y = to_y(page_layout.ledger_y[i])
+                draw.line([(to_x(page_layout.ledger_x1[i]), line_y),
+                           (to_x(page_layout.ledger_x2[i]), line_y)],
+                          fill=black, width=line_width)
+            
+            for i in page_layout.staff_heads(staff_index):
+                x = to_x(page_layout.head_x[i])
+                y = to_y(page_layout.head_y[i])
+                fill = white if page_layout.head_filled[i] else None
+                draw.ellipse([x - radius, y - radius, x + radius, y + radius],
+                             outline=black, fill=fill, width=line_width)
+        
+        if self.supersample > 1:
+            image = image.reduce(self.supersample)
+        return image
+    
+    def _draw_clef(self, image, draw, y_staff, clef_box, scale, to_x, to_y, black, line_width):
+        clef = self._get_clef(clef_box[2] * scale, clef_box[3] * scale)
+        if clef is None:
+            x = to_x(settings.X_START)
+            draw.line([(x, to_y(y_staff)), (x, to_y(y_staff + 40))], fill=black, width=line_width)
+            return
+        
+        clef_x, clef_y, clef_width, clef_height = clef_box
+        center_x = to_x(clef_x + clef_width / 2)
+        center_y = to_y(clef_y + clef_height / 2)
+        position = (round(center_x - clef.width / 2), round(center_y - clef.height / 2))
+        
+        if image.mode == "L":
+            image.paste(clef.convert("L"), position, clef)
+        else:
+            image.paste(clef.convert("RGB"), position, clef)
+    
+    def _get_clef(self, box_width, box_height):
+        if self._clef_source is None:
+            if not os.path.exists(self.clef_image_path):
+                return None
+            self._clef_source = Image.open(self.clef_image_path).convert("RGBA")
+        
+        source_width, source_height = self._clef_source.size
+        fit = min(box_width / source_width, box_height / source_height)
+        size = (max(1, round(source_width * fit)), max(1, round(source_height * fit)))
+        
+        clef = self._clef_scaled.get(size)
+        if clef is None:
+            clef = self._clef_source.resize(size, Image.Resampling.LANCZOS)
+            self._clef_scaled[size] = clef
+        return clef
@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import queue
+from collections import OrderedDict
+
+from src.core import layout, pitch
+from src.core.profiling import profiler
+
+
+PREVIEW_ZOOM = 2.0
+
+DRAFT_SCALE = 0.25
+
+NOTES_CACHE_SIZE = 1024
+
+DOCUMENTS_CACHE_SIZE = 2
+
+
+class PreviewCancelled(Exception):
+    pass
+
+
+def preview_page_keys(params):
+    page_params = dict(params)
+    num_pages = page_params.pop("num_pages")
+    if "pdf_path" in page_params:
+        pdf_path = page_params["pdf_path"]
+        stamp = os.stat(pdf_path).st_mtime_ns
+        return page_params, [("pdf", pdf_path, stamp, page) for page in range(num_pages)]
+    
+    page_params["notes_sequence"] = pitch.encode(page_params["notes_sequence"])
+    page_params["seed"] = layout.resolve_seed(page_params.get("seed"))
+    
+    keys = [layout.page_key(page=page, **page_params) for page in range(num_pages)]
+    return page_params, keys
+
+
+def render_preview_page(page_params, page, generator, notes_cache, zoom=PREVIEW_ZOOM, widths=(None,)):
+    import fitz
+    
+    with profiler.span("preview.layout"):
+        staff_notes = _page_notes(notes_cache, page_params, page)
+        page_layout = layout.layout_page(page=page, staff_notes=staff_notes, **page_params)
+    
+    with profiler.span("preview.pdf"):
+        pdf_bytes = generator.render_bytes([page_layout])
+    
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        for width in widths:
+            with profiler.span("preview.rasterize"):
+                samples = _page_samples(doc[0], zoom, width)
+            yield samples
+    finally:
+        doc.close()
+
+
+def render_document_page(pdf_path, page, documents, zoom=PREVIEW_ZOOM, widths=(None,)):
+    import fitz
+    
+    doc = documents.get(pdf_path)
+    if doc is None:
+        doc = documents[pdf_path] = fitz.open(pdf_path)
+        while len(documents) > DOCUMENTS_CACHE_SIZE:
+            documents.popitem(last=False)[1].close()
+    else:
+        documents.move_to_end(pdf_path)
+    
+    for width in widths:
+        with profiler.span("preview.rasterize"):
+            samples = _page_samples(doc[page], zoom, width)
+        yield samples
+
+
+def _page_samples(pdf_page, zoom, width=None):
+    import fitz
+    
+    if width is not None:
+        zoom = width / pdf_page.rect.width
+    pix = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return pix.width, pix.height, pix.stride, pix.samples
+
+
+def render_preview(params, latest_job, job_id, known_keys=(), page_order=None, generator=None, notes_cache=None, zoom=PREVIEW_ZOOM, documents=None, width=None, draft=False):
+    if generator is None:
+        from src.core.pdf_generator import PautaPDFGenerator
+        generator = PautaPDFGenerator()
+    notes_cache = notes_cache if notes_cache is not None else OrderedDict()
+    documents = documents if documents is not None else OrderedDict()
+    
+    page_params, keys = preview_page_keys(params)
+    if page_order is None:
+        page_order = range(len(keys))
+    
+    done = set(known_keys)
+    for page in page_order:
+        if not 0 <= page < len(keys) or keys[page] in done:
+            continue
+        if latest_job.value != job_id:
+            raise PreviewCancelled()
+        
+        widths = (width,)
+        if draft and width is not None:
+            widths = (max(1, round(width * DRAFT_SCALE)), width)
+            draft = False
+        
+        done.add(keys[page])
+        if "pdf_path" in page_params:
+            passes = render_document_page(page_params["pdf_path"], page, documents, zoom, widths)
+        else:
+            passes = render_preview_page(page_params, page, generator, notes_cache, zoom, widths)
+        
+        for samples in passes:
+            if latest_job.value != job_id:
+                raise PreviewCancelled()
+            yield keys, {keys[page]: samples}
+    
+    yield keys, {}
+
+
+def _page_notes(notes_cache, page_params, page):
+    key = layout.sampling_key(
+        page_params["notes_sequence"], page_params["quantity"], page,
+        page_params["random_mode"], page_params["notes_per_staff"], page_params["seed"],
+        page_params.get("constraints")
+    )
+    staff_notes = notes_cache.get(key)
+    if staff_notes is None:
+        staff_notes = layout.sample_page_notes(
+            page_params["notes_sequence"], page_params["quantity"], page,
+            page_params["random_mode"], page_params["notes_per_staff"], page_params["seed"],
+            page_params.get("constraints")
+        )
+        notes_cache[key] = staff_notes
+        while len(notes_cache) > NOTES_CACHE_SIZE:
+            notes_cache.popitem(last=False)
+    else:
+        notes_cache.move_to_end(key)
+    return staff_notes
+
+
+def _worker_main(requests, results, latest_job, zoom, output_profile):
+    from src.core.pdf_generator import PautaPDFGenerator
+    
+    generator = PautaPDFGenerator(output_profile=output_profile)
+    notes_cache = OrderedDict()
+    documents = OrderedDict()
+    profiler.forward = True
+    
+    while True:
+        request = requests.get()
+        while True:
+            try:
+                request = requests.get_nowait()
+            except queue.Empty:
+                break
+        
+        if request is None:
+            return
+        
+        job_id, params, known_keys, page_order, width, draft = request
+        if latest_job.value != job_id:
+            continue
+        
+        profiler.drain()
+        
+        try:
+            for keys, rendered in render_preview(params, latest_job, job_id, known_keys, page_order,
+                                                 generator, notes_cache, zoom, documents, width, draft):
+                results.put((job_id, keys, rendered, None, not rendered, profiler.drain()))
+        except PreviewCancelled:
+            continue
+        except Exception as e:
+            results.put((job_id, None, None, str(e), True, profiler.drain()))
+
+
+class PreviewWorker:
+    
+    def __init__(self, zoom=PREVIEW_ZOOM, output_profile="padrao"):
+        context = multiprocessing.get_context("spawn")
+        self._latest_job = context.Value("q", 0, lock=False)
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._next_job_id = 0
+        self._pending = False
+        self._process = context.Process(
+            target=_worker_main,
+            args=(self._requests, self._results, self._latest_job, zoom, output_profile),
+            daemon=True,
+        )
+        self._process.start()
+    
+    @property
+    def pending(self):
+        return self._pending
+    
+    def submit(self, params, known_keys=(), page_order=None, width=None, draft=False):
+        self._next_job_id += 1
+        self._latest_job.value = self._next_job_id
+        page_order = list(page_order) if page_order is not None else None
+        self._requests.put((self._next_job_id, params, frozenset(known_keys), page_order, width, draft))
+        self._pending = True
+        return self._next_job_id
+    
+    def cancel(self):
+        self._next_job_id += 1
+        self._latest_job.value = self._next_job_id
+        self._pending = False
+    
+    def poll(self):
+        results = []
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == self._next_job_id:
+                profiler.merge(item[5])
+                results.append(item[:4])
+                if item[4]:
+                    self._pending = False
+        return results
+    
+    def close(self, timeout=1.0):
+        self.cancel()
+        try:
+            self._requests.put(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
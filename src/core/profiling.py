@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+ENV_VAR = "PAUTA_PROFILE"
+
+OUTPUT_ENV_VAR = "PAUTA_PROFILE_OUTPUT"
+
+HISTOGRAM_BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+def enabled_from_env():
+    value = os.environ.get(ENV_VAR, "").strip().lower()
+    return value not in ("", "0", "false", "no", "nao", "não")
+
+
+class SpanStats:
+    
+    __slots__ = ("count", "total", "min", "max", "buckets")
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        
+        milliseconds = seconds * 1000
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if milliseconds <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+    
+    def to_dict(self):
+        labels = [f"<={bound}ms" for bound in HISTOGRAM_BOUNDS_MS] + [f">{HISTOGRAM_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * 1000,
+            "max_ms": (self.max or 0.0) * 1000,
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class Profiler:
+    
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.forward = False
+        self.stats = {}
+        self.frame = {}
+        self._pending = []
+    
+    def record(self, name, seconds):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = SpanStats()
+        stats.add(seconds)
+        self.frame[name] = self.frame.get(name, 0.0) + seconds
+        if self.forward:
+            self._pending.append((name, seconds))
+    
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def merge(self, records):
+        for name, seconds in records or ():
+            self.record(name, seconds)
+    
+    def drain(self):
+        records, self._pending = self._pending, []
+        return records
+    
+    def start_frame(self):
+        self.frame = {}
+    
+    def snapshot(self):
+        return {name: stats.to_dict() for name, stats in sorted(self.stats.items())}
+    
+    def reset(self):
+        self.stats = {}
+        self.frame = {}
+        self._pending = []
+    
+    def dump_json(self, path, extra=None):
+        data = self.snapshot()
+        data.update(extra or {})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+profiler = Profiler(enabled_from_env())
+
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def dump_on_exit(extra=None):
+    path = os.environ.get(OUTPUT_ENV_VAR)
+    if profiler.enabled and path:
+        profiler.dump_json(path, extra)
@@ -0,0 +1,171 @@
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core import layout, pitch
+from src.core.files import replace_file
+from src.core.pdf_generator import PautaPDFGenerator
+
+
+RASTER_FORMATS = ("png", "tiff")
+
+COLOR_MODES = ("rgb", "cinza", "1bit")
+
+DEFAULT_DPI = 150
+
+DEFAULT_CHUNK_PAGES = 32
+
+BILEVEL_THRESHOLD = 160
+
+TIFF_COMPRESSION = {"rgb": "tiff_deflate", "cinza": "tiff_deflate", "1bit": "group4"}
+
+
+def raster_format_for_path(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".png":
+        return "png"
+    if extension in (".tif", ".tiff"):
+        return "tiff"
+    return None
+
+
+class RasterExporter:
+    
+    def __init__(self, generator=None, dpi=DEFAULT_DPI, image_format="png", color="rgb", workers=None, chunk_pages=DEFAULT_CHUNK_PAGES):
+        if image_format not in RASTER_FORMATS:
+            raise ValueError(f"Formato de imagem inválido: {image_format} (use 'png' ou 'tiff')")
+        if color not in COLOR_MODES:
+            raise ValueError(f"Cor inválida: {color} (use 'rgb', 'cinza' ou '1bit')")
+        if dpi < 1:
+            raise ValueError("A resolução deve ser pelo menos 1 dpi")
+        
+        self.generator = generator or PautaPDFGenerator()
+        self.dpi = dpi
+        self.image_format = image_format
+        self.color = color
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_pages = max(1, int(chunk_pages))
+    
+    def generate(self, notes_sequence, quantity, output_path, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, progress=None, cancel_token=None, constraints=None):
+        if not notes_sequence:
+            raise ValueError("Nenhuma nota selecionada para gerar as imagens")
+        
+        seed = layout.resolve_seed(seed)
+        page_args = (pitch.encode(notes_sequence), quantity, staff_gap_cm, random_mode, notes_per_staff, seed, constraints)
+        
+        written = []
+        submitted = 0
+        tiff = None
+        temp_path = None
+        try:
+            if self.image_format == "tiff":
+                from PIL import TiffImagePlugin
+                
+                output_dir = os.path.dirname(os.path.abspath(output_path))
+                temp_fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=output_dir)
+                os.close(temp_fd)
+                tiff = TiffImagePlugin.AppendingTiffWriter(temp_path, new=True)
+            
+            import fitz
+            
+            writers = 1 if tiff is not None else self.workers
+            with ThreadPoolExecutor(max_workers=writers) as executor:
+                pending = deque()
+                try:
+                    for start in range(0, num_pages, self.chunk_pages):
+                        end = min(num_pages, start + self.chunk_pages)
+                        doc = fitz.open(stream=self._chunk_pdf(page_args, start, end), filetype="pdf")
+                        try:
+                            for page in range(start, end):
+                                if cancel_token is not None:
+                                    cancel_token.raise_if_cancelled()
+                                image = self._render_page(doc[page - start])
+                                submitted = page + 1
+                                pending.append(executor.submit(self._write_page, image, page, tiff, output_path))
+                                if len(pending) >= 2 * writers:
+                                    self._finish_page(pending.popleft().result(), written, num_pages, progress)
+                        finally:
+                            doc.close()
+                    
+                    while pending:
+                        self._finish_page(pending.popleft().result(), written, num_pages, progress)
+                finally:
+                    for future in pending:
+                        future.cancel()
+            
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            
+            if tiff is not None:
+                tiff.close()
+                tiff = None
+                replace_file(temp_path, output_path)
+                return [output_path]
+            return written
+        except BaseException:
+            if tiff is not None:
+                tiff.close()
+            if temp_path is not None:
+                partial = [temp_path]
+            else:
+                partial = [layout.page_output_path(output_path, page) for page in range(submitted)]
+            for path in partial:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            raise
+    
+    def _chunk_pdf(self, page_args, start, end):
+        notes_sequence, quantity, staff_gap_cm, random_mode, notes_per_staff, seed, constraints = page_args
+        return self.generator.render_bytes(
+            layout.layout_page(notes_sequence, quantity, page, staff_gap_cm,
+                               random_mode, notes_per_staff, seed, constraints=constraints)
+            for page in range(start, end)
+        )
+    
+    def _render_page(self, pdf_page):
+        import fitz
+        
+        scale = self.dpi / 72.0
+        colorspace = fitz.csRGB if self.color == "rgb" else fitz.csGRAY
+        pix = pdf_page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=colorspace, alpha=False)
+        return self._to_image(pix)
+    
+    def _write_page(self, image, page, tiff, output_path):
+        if tiff is not None:
+            image.save(tiff, format="TIFF", dpi=(self.dpi, self.dpi),
+                       compression=TIFF_COMPRESSION[self.color])
+            tiff.newFrame()
+            return page, None
+        
+        page_path = layout.page_output_path(output_path, page)
+        image.save(page_path, format="PNG", dpi=(self.dpi, self.dpi))
+        return page, page_path
+    
+    def _to_image(self, pix):
+        from PIL import Image
+        
+        mode = "RGB" if self.color == "rgb" else "L"
+        image = Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+        if self.color == "1bit":
+            return image.point(lambda value: 255 if value >= BILEVEL_THRESHOLD else 0, mode="1")
+        return image
+    
+    def _finish_page(self, result, written, total, progress):
+        page, output = result
+        if output is not None:
+            written.append(output)
+        
+        if progress is not None:
+            progress(page + 1, total)
+
+
+def export_raster(output_path, notes_sequence, quantity, num_pages, staff_gap_cm=None, random_mode=True, notes_per_staff=15, seed=None, progress=None, cancel_token=None, generator=None, dpi=DEFAULT_DPI, image_format=None, color="rgb", workers=None, constraints=None):
+    image_format = image_format or raster_format_for_path(output_path) or "png"
+    exporter = RasterExporter(generator, dpi, image_format, color, workers)
+    return exporter.generate(notes_sequence, quantity, output_path, num_pages,
+                             staff_gap_cm=staff_gap_cm, random_mode=random_mode,
+                             notes_per_staff=notes_per_staff, seed=seed,
+                             progress=progress, cancel_token=cancel_token, constraints=constraints)
@@ -0,0 +1,240 @@
+import functools
+from collections import Counter
+
+from src.core import pitch
+
+
+BLOCK_PAGES = 64
+
+BLOCK_CACHE_SIZE = 16
+
+COVERAGE_ROUNDS = 8
+
+CONSTRAINT_DEFAULTS = {
+    "weights": None,
+    "no_repeat": False,
+    "max_interval": None,
+    "cover_strings": False,
+}
+
+
+def normalize_constraints(constraints):
+    if not constraints:
+        return None
+    
+    unknown = sorted(set(constraints) - set(CONSTRAINT_DEFAULTS))
+    if unknown:
+        raise ValueError(f"Restrições desconhecidas: {', '.join(unknown)}")
+    
+    weights = constraints.get("weights")
+    if weights:
+        unknown = [note for note in weights if note not in pitch.PITCH_CODES]
+        if unknown:
+            raise ValueError(f"Notas desconhecidas nos pesos: {', '.join(unknown)}")
+        weights = {note: float(weight) for note, weight in sorted(weights.items())}
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Os pesos das notas não podem ser negativos")
+        if all(weight == 1.0 for weight in weights.values()):
+            weights = None
+    else:
+        weights = None
+    
+    max_interval = constraints.get("max_interval")
+    if max_interval is not None:
+        max_interval = int(max_interval)
+        if max_interval < 1:
+            raise ValueError("O salto máximo entre notas deve ser pelo menos 1")
+    
+    normalized = {
+        "weights": weights,
+        "no_repeat": bool(constraints.get("no_repeat")),
+        "max_interval": max_interval,
+        "cover_strings": bool(constraints.get("cover_strings")),
+    }
+    if normalized == CONSTRAINT_DEFAULTS:
+        return None
+    return normalized
+
+
+def constraints_key(constraints):
+    constraints = normalize_constraints(constraints)
+    if constraints is None:
+        return None
+    
+    weights = constraints["weights"]
+    return (tuple(weights.items()) if weights else None, constraints["no_repeat"],
+            constraints["max_interval"], constraints["cover_strings"])
+
+
+def sample_document(notes_sequence, quantity, num_pages, notes_per_staff, seed, constraints=None):
+    block_count = -(-num_pages // BLOCK_PAGES)
+    codes = _sample_blocks(pitch.sequence_key(notes_sequence), quantity, notes_per_staff, seed,
+                           constraints_key(constraints), 0, block_count)
+    return codes.reshape(-1, quantity, notes_per_staff)[:num_pages]
+
+
+def sample_page(notes_sequence, quantity, page, notes_per_staff, seed, constraints=None):
+    block = _cached_block(pitch.sequence_key(notes_sequence), quantity, notes_per_staff, seed,
+                          constraints_key(constraints), page // BLOCK_PAGES)
+    return block[page % BLOCK_PAGES]
+
+
+@functools.lru_cache(maxsize=BLOCK_CACHE_SIZE)
+def _cached_block(notes, quantity, notes_per_staff, seed, key, block):
+    codes = _sample_blocks(notes, quantity, notes_per_staff, seed, key, block, block + 1)
+    codes = codes.reshape(BLOCK_PAGES, quantity, notes_per_staff)
+    codes.flags.writeable = False
+    return codes
+
+
+def _sample_blocks(notes, quantity, notes_per_staff, seed, key, first_block, last_block):
+    import numpy as np
+    
+    if not notes:
+        raise ValueError("Nenhuma nota selecionada para gerar o PDF")
+    
+    codes = np.frombuffer(notes, dtype=np.uint8)
+    weight_pairs, no_repeat, max_interval, cover_strings = key or (None, False, None, False)
+    code_weights = np.ones(len(pitch.PITCH_NAMES))
+    for note, weight in weight_pairs or ():
+        code_weights[pitch.PITCH_CODES[note]] = weight
+    note_weights = code_weights[codes]
+    active = np.flatnonzero(note_weights > 0)
+    if not len(active):
+        raise ValueError("Todas as notas selecionadas têm peso zero")
+    
+    active_codes = codes[active]
+    weights = note_weights[active]
+    rows_per_block = BLOCK_PAGES * quantity
+    rngs = [np.random.default_rng([seed % 2 ** 64, block]) for block in range(first_block, last_block)]
+    
+    weighted = bool((weights != weights[0]).any())
+    if no_repeat or max_interval is not None or weighted:
+        allowed = _transition_mask(active_codes, no_repeat, max_interval)
+        
+        def draw(rng, rows):
+            return rng.random((rows, notes_per_staff))
+        
+        def sample(uniforms):
+            return _chain_rows(uniforms, weights, allowed)
+    else:
+        allowed = None
+        cycles = -(-notes_per_staff // len(active))
+        
+        def draw(rng, rows):
+            return rng.random((rows, cycles, len(active)))
+        
+        def sample(uniforms):
+            return _cycle_rows(uniforms, notes_per_staff)
+    
+    result = sample(np.concatenate([draw(rng, rows_per_block) for rng in rngs]))
+    
+    if cover_strings:
+        strings, string_count = _string_ids(active_codes)
+        if 1 < string_count <= notes_per_staff:
+            covered = _covers(result, strings, string_count)
+            for _ in range(COVERAGE_ROUNDS - 1):
+                failing = np.flatnonzero(~covered)
+                if not len(failing):
+                    break
+                blocks, counts = np.unique(failing // rows_per_block, return_counts=True)
+                result[failing] = sample(np.concatenate([draw(rngs[block], count)
+                                                         for block, count in zip(blocks, counts)]))
+                covered[failing] = _covers(result[failing], strings, string_count)
+            
+            failing = np.flatnonzero(~covered)
+            if len(failing):
+                string_list = strings.tolist()
+                allowed_rows = allowed.tolist() if allowed is not None else None
+                by_weight = sorted(range(len(weights)), key=lambda index: -weights[index])
+                candidates = [[index for index in by_weight if string_list[index] == string_id]
+                              for string_id in range(string_count)]
+                for row in failing:
+                    result[row] = _repair_coverage(result[row].tolist(), string_list, string_count,
+                                                   candidates, allowed_rows)
+    
+    return active_codes[result]
+
+
+def _cycle_rows(uniforms, notes_per_staff):
+    import numpy as np
+    
+    order = np.argsort(uniforms, axis=2)
+    return order.reshape(len(order), -1)[:, :notes_per_staff]
+
+
+def _chain_rows(uniforms, weights, allowed):
+    import numpy as np
+    
+    transitions = allowed * weights
+    dead_ends = transitions.sum(axis=1) == 0
+    transitions[dead_ends] = weights
+    cumulative = np.cumsum(transitions, axis=1)
+    first_cumulative = np.cumsum(weights)
+    last = len(weights) - 1
+    
+    rows, notes_per_staff = uniforms.shape
+    result = np.empty((rows, notes_per_staff), dtype=np.intp)
+    result[:, 0] = np.minimum(
+        np.searchsorted(first_cumulative, uniforms[:, 0] * first_cumulative[-1], side="right"), last)
+    for step in range(1, notes_per_staff):
+        row_cumulative = cumulative[result[:, step - 1]]
+        targets = uniforms[:, step, None] * row_cumulative[:, -1:]
+        result[:, step] = np.minimum((row_cumulative <= targets).sum(axis=1), last)
+    return result
+
+
+def _transition_mask(codes, no_repeat, max_interval):
+    import numpy as np
+    
+    allowed = np.ones((len(codes), len(codes)), dtype=bool)
+    if no_repeat:
+        allowed &= codes[:, None] != codes[None, :]
+    if max_interval is not None:
+        steps = np.asarray(pitch.PITCH_OFFSETS)[codes] / 5
+        allowed &= np.abs(steps[:, None] - steps[None, :]) <= max_interval
+    return allowed
+
+
+def _string_ids(codes):
+    import numpy as np
+    
+    strings = np.asarray(pitch.PITCH_STRINGS)[codes]
+    present = sorted(set(strings.tolist()) - {len(pitch.STRING_NAMES)}, key=pitch.STRING_NAMES.__getitem__)
+    ids = np.full(len(pitch.STRING_NAMES) + 1, len(present))
+    ids[present] = np.arange(len(present))
+    return ids[strings], len(present)
+
+
+def _covers(result, strings, string_count):
+    import numpy as np
+    
+    present = np.zeros((len(result), string_count + 1), dtype=bool)
+    present[np.arange(len(result))[:, None], strings[result]] = True
+    return present[:, :string_count].all(axis=1)
+
+
+def _repair_coverage(row, strings, string_count, candidates, allowed):
+    last = len(row) - 1
+    for string_id in range(string_count):
+        counts = Counter(strings[index] for index in row)
+        if counts[string_id]:
+            continue
+        
+        for position in range(last, -1, -1):
+            if counts[strings[row[position]]] < 2:
+                continue
+            
+            for candidate in candidates[string_id]:
+                if allowed is None:
+                    fits = candidate not in row
+                else:
+                    fits = ((position == 0 or allowed[row[position - 1]][candidate])
+                            and (position == last or allowed[candidate][row[position + 1]]))
+                if fits:
+                    row[position] = candidate
+                    break
+            else:
+                continue
+            break
+    return row
@@ -0,0 +1,112 @@
+import base64
+import os
+
+from src.config import settings
+from src.core import layout
+
+
+def _fmt(value):
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return text if text != "-0" else "0"
+
+
+class SVGRenderer:
+    
+    def __init__(self):
+        self.clef_image_path = settings.CLEF_IMAGE_PATH
+        self._clef_href = None
+    
+    def render(self, page_layouts, output_path):
+        paths = []
+        for page_layout in page_layouts:
+            page_path = layout.page_output_path(output_path, page_layout.page_index)
+            with open(page_path, "w", encoding="utf-8") as f:
+                self.render_page(page_layout, f)
+            paths.append(page_path)
+        return paths
+    
+    def render_page(self, page_layout, out):
+        width = _fmt(settings.PAGE_WIDTH)
+        height = _fmt(settings.PAGE_HEIGHT)
+        
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+                  f'width="{width}pt" height="{height}pt" viewBox="0 0 {width} {height}">\n')
+        out.write(f'<rect width="{width}" height="{height}" fill="#fff"/>\n')
+        self._write_staff_definition(out)
+        
+        out.write('<g stroke="#000" stroke-width="1">\n')
+        for staff_index in range(page_layout.staff_count):
+            y_staff = page_layout.staff_y[staff_index]
+            out.write(f'<use xlink:href="#staff" y="{_fmt(-y_staff)}"/>\n')
+            self._write_staff_notes(out, page_layout, staff_index)
+        out.write('</g>\n</svg>\n')
+    
+    def _write_staff_definition(self, out):
+        left = _fmt(settings.X_START)
+        right = _fmt(settings.X_START + settings.STAFF_WIDTH)
+        
+        out.write('<defs>\n<g id="staff" stroke="#000" stroke-width="1">\n')
+        
+        lines = "".join(f"M{left} {_fmt(self._y(line * 10))}H{right}" for line in range(5))
+        barline = _fmt(settings.BARLINE_X)
+        lines += f"M{barline} {_fmt(self._y(0))}V{_fmt(self._y(40))}"
+        out.write(f'<path d="{lines}" fill="none"/>\n')
+        
+        clef_href = self._get_clef_href()
+        if clef_href is None:
+            x = _fmt(settings.X_START)
+            out.write(f'<path d="M{x} {_fmt(self._y(0))}V{_fmt(self._y(40))}"/>\n')
+        else:
+            clef_x, clef_y, clef_width, clef_height = layout.clef_box(0)
+            out.write(f'<image x="{_fmt(clef_x)}" y="{_fmt(self._y(clef_y + clef_height))}" '
+                      f'width="{_fmt(clef_width)}" height="{_fmt(clef_height)}" '
+                      f'preserveAspectRatio="xMidYMid meet" xlink:href="{clef_href}"/>\n')
+        
+        out.write('</g>\n</defs>\n')
+    
+    def _write_staff_notes(self, out, page_layout, staff_index):
+        ledgers = page_layout.staff_ledgers(staff_index)
+        if ledgers:
+            d = "".join(
+                f"M{_fmt(page_layout.ledger_x1[i])} {_fmt(self._y(page_layout.ledger_y[i]))}"
+                f"H{_fmt(page_layout.ledger_x2[i])}"
+                for i in ledgers
+            )
+            out.write(f'<path d="{d}" fill="none"/>\n')
+        
+        heads = page_layout.staff_heads(staff_index)
+        if not heads:
+            return
+        
+        radius = settings.NOTE_RADIUS
+        fills = []
+        outlines = []
+        for i in heads:
+            circle = self._circle_path(page_layout.head_x[i], page_layout.head_y[i], radius)
+            if page_layout.head_filled[i]:
+                fills.append(circle)
+            outlines.append(circle)
+        
+        if fills:
+            out.write(f'<path d="{"".join(fills)}" fill="#fff" stroke="none"/>\n')
+        out.write(f'<path d="{"".join(outlines)}" fill="none"/>\n')
+    
+    def _circle_path(self, x, y, radius):
+        r = _fmt(radius)
+        return (f"M{_fmt(x - radius)} {_fmt(self._y(y))}"
+                f"a{r} {r} 0 1 0 {_fmt(2 * radius)} 0"
+                f"a{r} {r} 0 1 0 {_fmt(-2 * radius)} 0Z")
+    
+    @staticmethod
+    def _y(y):
+        return settings.PAGE_HEIGHT - y
+    
+    def _get_clef_href(self):
+        if self._clef_href is None:
+            if not os.path.exists(self.clef_image_path):
+                return None
+            with open(self.clef_image_path, "rb") as f:
+                encoded = base64.b64encode(f.read()).decode("ascii")
+            self._clef_href = f"data:image/png;base64,{encoded}"
+        return self._clef_href
@@ -1,10 +1,33 @@
 import tkinter as tk
-from tkinter import messagebox
-import tempfile
+from tkinter import messagebox, filedialog
 import os
+import random
+import threading
 
-from src.gui.widgets import NoteCheckboxPanel, PDFPreviewCanvas, ConfigurationPanel
-from src.core.pdf_generator import PautaPDFGenerator
+from src.config import settings
+from src.gui.widgets import NoteCheckboxPanel, PDFPreviewCanvas, ConfigurationPanel, ExportProgressDialog, THUMBNAIL_ZOOM
+from src.core.pdf_cache import PDFCache, default_cache_dir
+from src.core import layout
+from src.core.preview_worker import PreviewWorker
+from src.core import profiling
+from src.core.profiling import profiler
+
+
+PROFILE_STATUS_SPANS = (
+    ("preview.layout", "layout"),
+    ("preview.pdf", "reportlab"),
+    ("preview.rasterize", "fitz"),
+    ("preview.resize", "redimensionar"),
+    ("preview.redraw", "desenho"),
+)
+
+PROFILE_REFRESH_MS = 500
+
+LAST_PREVIEW_FILENAME = "ultimo_preview.png"
+
+
+def last_preview_path():
+    return os.path.join(os.path.dirname(default_cache_dir()), LAST_PREVIEW_FILENAME)
 
 
 class PautaGeneratorGUI(tk.Tk):
@@ -15,16 +38,44 @@ class PautaGeneratorGUI(tk.Tk):
         self.title("Gerador de Pautas - Violino")
         self.geometry("1200x800")
         
-        self.pdf_generator = PautaPDFGenerator()
+        self.pdf_exporter = None
+        
+        self.export_job = None
         
-        self.temp_pdf_path = None
+        self.pdf_cache = PDFCache()
+        
+        self.seed = random.randrange(2 ** 32)
         
         self.preview_update_id = None
         
+        self.preview_worker = PreviewWorker()
+        
+        self.preview_params = None
+        
+        self.preview_requested = set()
+        self.preview_width = None
+        
+        self.preview_poll_id = None
+        
+        self.thumbnail_worker = PreviewWorker(zoom=THUMBNAIL_ZOOM, output_profile="compacto")
+        
+        self.thumbnail_params = None
+        
+        self.thumbnail_requested = set()
+        
+        self.thumbnail_poll_id = None
+        
         self._create_widgets()
         
+        self.preview_canvas.show_snapshot(last_preview_path())
+        
         self._setup_auto_preview()
         
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        
+        if profiler.enabled:
+            self.after(PROFILE_REFRESH_MS, self._refresh_profile_status)
+        
         self.after(100, self._update_preview)
     
     def _create_widgets(self):
@@ -58,16 +109,31 @@ class PautaGeneratorGUI(tk.Tk):
         self.config_panel.set_on_change_callback(self._schedule_preview_update)
         
         self.note_panel.set_on_change_callback(self._schedule_preview_update)
+        
+        self.preview_canvas.set_on_pages_needed(self._on_preview_pages_needed)
+        
+        self.preview_canvas.set_on_thumbnails_needed(self._on_thumbnails_needed)
     
     def _schedule_preview_update(self):
         if self.preview_update_id:
             self.after_cancel(self.preview_update_id)
         
-        self.preview_update_id = self.after(500, self._update_preview)
+        self.preview_worker.cancel()
+        self.thumbnail_worker.cancel()
+        
+        delay = 10 if self.fast_preview_var.get() else 200
+        self.preview_update_id = self.after(delay, self._update_preview)
     
     def _update_preview(self):
-        selected_notes = self.note_panel.get_selected_notes()
+        self.preview_update_id = None
+        
+        profiler.start_frame()
+        
+        selected_notes = self.note_panel.get_selected_pitches()
         if not selected_notes:
+            self.preview_worker.cancel()
+            self.thumbnail_worker.cancel()
+            self.thumbnail_params = None
             self.preview_canvas.clear()
             return
         
@@ -81,40 +147,126 @@ class PautaGeneratorGUI(tk.Tk):
             notes_per_staff = self.config_panel.get_notes_per_staff()
             mode = self.config_panel.get_mode()
             random_mode = (mode == "aleatorio")
+            constraints = self.config_panel.get_constraints()
             
-            if self.temp_pdf_path and os.path.exists(self.temp_pdf_path):
-                try:
-                    os.remove(self.temp_pdf_path)
-                except:
-                    pass
-            
-            temp_fd, self.temp_pdf_path = tempfile.mkstemp(suffix=".pdf", 
-                                                          prefix="pauta_preview_")
-            os.close(temp_fd)
-            
-            self.pdf_generator.generate(
+            params = dict(
                 notes_sequence=selected_notes,
                 quantity=quantity,
-                output_path=self.temp_pdf_path,
                 num_pages=num_pages,
                 staff_gap_cm=staff_gap_cm,
                 random_mode=random_mode,
-                notes_per_staff=notes_per_staff
+                notes_per_staff=notes_per_staff,
+                seed=self.seed,
+                constraints=constraints
             )
+            self.thumbnail_params = params
+            self._submit_thumbnails(self.preview_canvas.thumbnail_order())
             
-            self.preview_canvas.load_pdf(self.temp_pdf_path)
+            if self.fast_preview_var.get():
+                self.preview_worker.cancel()
+                
+                def page_provider(page):
+                    return layout.layout_page(
+                        selected_notes, quantity, page, staff_gap_cm,
+                        random_mode, notes_per_staff, self.seed, constraints=constraints
+                    )
+                
+                self.preview_canvas.show_vector_preview(num_pages, page_provider,
+                                                        settings.CLEF_IMAGE_PATH)
+                return
+            
+            self.preview_params = params
+            self._submit_preview(self.preview_canvas.page_order(num_pages), draft=True)
             
         except Exception as e:
             self.preview_canvas.clear()
     
+    def _submit_preview(self, page_order, draft=False):
+        self.preview_requested = set(page_order)
+        self.preview_width = self.preview_canvas.preview_width()
+        self.preview_worker.submit(self.preview_params, self.preview_canvas.known_page_keys(), page_order,
+                                   width=self.preview_width, draft=draft)
+        
+        self._start_preview_polling()
+    
+    def _on_preview_pages_needed(self, pages):
+        if self.preview_params is None:
+            return
+        if self.fast_preview_var.get() and "pdf_path" not in self.preview_params:
+            return
+        
+        if (self.preview_worker.pending and self.preview_requested.issuperset(pages)
+                and self.preview_width == self.preview_canvas.preview_width()):
+            return
+        
+        self._submit_preview(self.preview_canvas.page_order(), draft=self.preview_canvas.needs_draft())
+    
+    def _start_preview_polling(self):
+        if self.preview_poll_id is None:
+            self.preview_poll_id = self.after(16, self._poll_preview)
+    
+    def _poll_preview(self):
+        self.preview_poll_id = None
+        
+        for job_id, page_keys, rendered, error in self.preview_worker.poll():
+            if error:
+                print(f"Erro ao gerar preview: {error}")
+                self.preview_canvas.clear()
+                return
+            
+            self.preview_canvas.show_pages(page_keys, rendered)
+        
+        if self.preview_worker.pending:
+            self._start_preview_polling()
+    
+    def _submit_thumbnails(self, page_order):
+        self.thumbnail_requested = set(page_order)
+        self.thumbnail_worker.submit(self.thumbnail_params, self.preview_canvas.known_thumbnail_keys(),
+                                     page_order)
+        
+        if self.thumbnail_poll_id is None:
+            self.thumbnail_poll_id = self.after(16, self._poll_thumbnails)
+    
+    def _on_thumbnails_needed(self, pages):
+        if self.thumbnail_params is None:
+            return
+        
+        if self.thumbnail_worker.pending and self.thumbnail_requested.issuperset(pages):
+            return
+        
+        self._submit_thumbnails(self.preview_canvas.thumbnail_order())
+    
+    def _poll_thumbnails(self):
+        self.thumbnail_poll_id = None
+        
+        for job_id, page_keys, rendered, error in self.thumbnail_worker.poll():
+            if error:
+                print(f"Erro ao gerar miniaturas: {error}")
+                return
+            
+            self.preview_canvas.show_thumbnails(page_keys, rendered)
+        
+        if self.thumbnail_worker.pending:
+            self.thumbnail_poll_id = self.after(16, self._poll_thumbnails)
+    
     def _create_right_panel(self, parent):
         title_label = tk.Label(parent, text="PREVIEW", 
                               font=("Helvetica", 12, "bold"))
         title_label.pack(pady=(10, 5))
         
+        self.fast_preview_var = tk.BooleanVar(value=False)
+        fast_preview_check = tk.Checkbutton(parent, text="Preview rápido (sem gerar PDF)",
+                                            variable=self.fast_preview_var,
+                                            font=("Helvetica", 9),
+                                            command=self._update_preview)
+        fast_preview_check.pack(pady=(0, 5))
+        
         self.preview_canvas = PDFPreviewCanvas(parent)
         self.preview_canvas.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         
+        if profiler.enabled:
+            self._create_profile_status_bar(parent)
+        
         button_frame = tk.Frame(parent)
         button_frame.pack(fill="x", padx=10, pady=(0, 10))
         
@@ -123,7 +275,55 @@ class PautaGeneratorGUI(tk.Tk):
                                      font=("Helvetica", 10, "bold"),
                                      bg="#2196F3", fg="white",
                                      width=25, height=2)
-        generate_pdf_btn.pack()
+        generate_pdf_btn.pack(side="left", expand=True)
+        
+        reshuffle_btn = tk.Button(button_frame, text="Sortear Novamente",
+                                  command=self._on_reshuffle,
+                                  font=("Helvetica", 10),
+                                  width=18, height=2)
+        reshuffle_btn.pack(side="left", expand=True)
+    
+    def _create_profile_status_bar(self, parent):
+        status_frame = tk.Frame(parent, relief="sunken", borderwidth=1)
+        status_frame.pack(fill="x", padx=10, pady=(0, 10))
+        
+        self.profile_label = tk.Label(status_frame, text="Perfil: aguardando preview...",
+                                      font=("Helvetica", 8), anchor="w")
+        self.profile_label.pack(side="left", fill="x", expand=True, padx=(5, 0))
+        
+        save_btn = tk.Button(status_frame, text="Salvar estatísticas",
+                             command=self._on_save_profile, font=("Helvetica", 8))
+        save_btn.pack(side="right", padx=5, pady=2)
+    
+    def _refresh_profile_status(self):
+        frame = profiler.frame
+        parts = [f"{label} {frame[name] * 1000:.0f} ms"
+                 for name, label in PROFILE_STATUS_SPANS if name in frame]
+        if parts:
+            self.profile_label.config(text="Último preview: " + " · ".join(parts))
+        
+        self.after(PROFILE_REFRESH_MS, self._refresh_profile_status)
+    
+    def _on_save_profile(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title="Salvar estatísticas de desempenho"
+        )
+        if filename:
+            profiler.dump_json(filename, {"preview_cache": self.preview_canvas.cache_stats()})
+    
+    def _get_pdf_exporter(self, output_profile="padrao"):
+        if self.pdf_exporter is None or self.pdf_exporter.generator.output_profile != output_profile:
+            from src.core.export import ParallelPDFExporter
+            from src.core.pdf_generator import PautaPDFGenerator
+            
+            self.pdf_exporter = ParallelPDFExporter(PautaPDFGenerator(output_profile=output_profile))
+        return self.pdf_exporter
+    
+    def _on_reshuffle(self):
+        self.seed = random.randrange(2 ** 32)
+        self._schedule_preview_update()
     
     def _validate_inputs(self):
         selected_notes = self.note_panel.get_selected_notes()
@@ -147,37 +347,127 @@ class PautaGeneratorGUI(tk.Tk):
             messagebox.showerror("Erro", "Escolha um local para salvar o PDF.")
             return
         
+        if self.export_job is not None:
+            return
+        
         try:
-            selected_notes = self.note_panel.get_selected_notes()
+            selected_notes = self.note_panel.get_selected_pitches()
             quantity = self.config_panel.get_quantity()
             staff_gap_cm = self.config_panel.get_staff_gap()
             num_pages = self.config_panel.get_pages()
             notes_per_staff = self.config_panel.get_notes_per_staff()
             mode = self.config_panel.get_mode()
             random_mode = (mode == "aleatorio")
+            constraints = self.config_panel.get_constraints()
+            output_profile = self.config_panel.get_output_profile()
+            raster_options = self.config_panel.get_raster_options()
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao gerar PDF:\n{str(e)}")
+            return
+        
+        from src.core.export import CancelToken
+        from src.core.raster_export import raster_format_for_path
+        
+        image_format = raster_format_for_path(output_path)
+        if image_format is None:
+            pdf_exporter = self._get_pdf_exporter(output_profile)
             
-            self.pdf_generator.generate(
-                notes_sequence=selected_notes,
-                quantity=quantity,
-                output_path=output_path,
-                num_pages=num_pages,
-                staff_gap_cm=staff_gap_cm,
-                random_mode=random_mode,
-                notes_per_staff=notes_per_staff
-            )
-            
-            messagebox.showinfo("Sucesso", 
-                              f"PDF gerado com sucesso!\n\nLocal: {output_path}")
+            def export(**params):
+                self.pdf_cache.generate(pdf_exporter, **params)
+        else:
+            from src.core.pdf_generator import PautaPDFGenerator
+            from src.core.raster_export import RasterExporter
             
-            self.preview_canvas.load_pdf(output_path)
+            raster_exporter = RasterExporter(PautaPDFGenerator(output_profile=output_profile),
+                                             image_format=image_format, **raster_options)
             
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao gerar PDF:\n{str(e)}")
-    
-    def __del__(self):
-        if self.temp_pdf_path and os.path.exists(self.temp_pdf_path):
+            def export(**params):
+                job["written"] = raster_exporter.generate(**params)
+        
+        cancel_token = CancelToken()
+        job = {
+            "output_path": output_path,
+            "image_format": image_format,
+            "num_pages": num_pages,
+            "done_pages": 0,
+            "error": None,
+            "cancel_token": cancel_token,
+            "dialog": ExportProgressDialog(self, num_pages, on_cancel=cancel_token.cancel),
+        }
+        
+        def progress(done_pages, total_pages):
+            job["done_pages"] = done_pages
+        
+        def run():
             try:
-                os.remove(self.temp_pdf_path)
-            except:
-                pass
-
+                export(
+                    output_path=output_path,
+                    notes_sequence=selected_notes,
+                    quantity=quantity,
+                    num_pages=num_pages,
+                    staff_gap_cm=staff_gap_cm,
+                    random_mode=random_mode,
+                    notes_per_staff=notes_per_staff,
+                    seed=self.seed,
+                    constraints=constraints,
+                    progress=progress,
+                    cancel_token=cancel_token
+                )
+            except BaseException as e:
+                job["error"] = e
+        
+        job["thread"] = threading.Thread(target=run, daemon=True)
+        self.export_job = job
+        job["thread"].start()
+        
+        self.after(50, self._poll_export)
+    
+    def _poll_export(self):
+        job = self.export_job
+        job["dialog"].set_progress(job["done_pages"])
+        
+        if job["thread"].is_alive():
+            self.after(50, self._poll_export)
+            return
+        
+        job["dialog"].close()
+        self.export_job = None
+        
+        from src.core.export import ExportCancelled
+        
+        error = job["error"]
+        if isinstance(error, ExportCancelled):
+            messagebox.showinfo("Cancelado", "A geração do PDF foi cancelada.")
+            return
+        if error is not None:
+            messagebox.showerror("Erro", f"Erro ao gerar PDF:\n{str(error)}")
+            return
+        
+        if job["image_format"] is not None:
+            written = job["written"]
+            messagebox.showinfo("Sucesso",
+                              f"{len(written)} imagem(ns) gerada(s) com sucesso!\n\nLocal: {written[0]}")
+            return
+        
+        messagebox.showinfo("Sucesso",
+                          f"PDF gerado com sucesso!\n\nLocal: {job['output_path']}")
+        
+        self.preview_params = {"pdf_path": job["output_path"], "num_pages": job["num_pages"]}
+        self._submit_preview(self.preview_canvas.page_order(job["num_pages"]), draft=True)
+        
+        self.thumbnail_worker.cancel()
+        self.thumbnail_params = {"pdf_path": job["output_path"], "num_pages": job["num_pages"]}
+        self._submit_thumbnails(self.preview_canvas.thumbnail_order())
+    
+    def _on_close(self):
+        if self.export_job is not None:
+            self.export_job["cancel_token"].cancel()
+            self.export_job["thread"].join(timeout=2.0)
+        self.preview_worker.close()
+        self.thumbnail_worker.close()
+        try:
+            self.preview_canvas.save_snapshot(last_preview_path())
+        except OSError as e:
+            print(f"Erro ao salvar preview: {e}")
+        profiling.dump_on_exit({"preview_cache": self.preview_canvas.cache_stats()})
+        self.destroy()
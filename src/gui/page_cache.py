@@ -0,0 +1,84 @@
+from collections import OrderedDict
+
+
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+def image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+class PageRasterCache:
+    
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def keys(self):
+        return set(self._entries)
+    
+    @property
+    def size_bytes(self):
+        return self._bytes
+    
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    def peek(self, key):
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+    
+    def put(self, key, image):
+        self.discard(key)
+        
+        size = image_bytes(image)
+        self._entries[key] = (image, size)
+        self._bytes += size
+        self._evict()
+    
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+    
+    def discard_where(self, predicate):
+        for key in [key for key in self._entries if predicate(key)]:
+            self.discard(key)
+    
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+    
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            self.discard(next(iter(self._entries)))
+            self.evictions += 1
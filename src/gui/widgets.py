@@ -1,12 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, filedialog
-import fitz
-from PIL import Image, ImageTk
 import tempfile
 import os
-import io
+from collections import OrderedDict
 
 from src.config import settings
+from src.core import pitch
+from src.core.profiling import profiler, timed
+from src.gui.page_cache import PageRasterCache, DEFAULT_MAX_BYTES
+
+
+RESIZED_CACHE_SIZE = 16
+
+RESIZE_SETTLE_MS = 150
+
+PREFETCH_PAGES = 1
+
+THUMBNAIL_WIDTH = 60
+
+THUMBNAIL_HEIGHT = round(THUMBNAIL_WIDTH * settings.PAGE_HEIGHT / settings.PAGE_WIDTH)
+
+THUMBNAIL_ZOOM = THUMBNAIL_WIDTH / settings.PAGE_WIDTH
+
+THUMBNAIL_GAP = 12
+
+THUMBNAIL_PREFETCH_PAGES = 4
+
+THUMBNAIL_CACHE_BYTES = 32 * 1024 * 1024
 
 
 class NoteCheckboxPanel(tk.Frame):
@@ -68,6 +88,9 @@ class NoteCheckboxPanel(tk.Frame):
                 selected.append(note)
         return selected
     
+    def get_selected_pitches(self):
+        return pitch.encode(self.get_selected_notes())
+    
     def select_all(self):
         for var in self.checkboxes.values():
             var.set(True)
@@ -79,18 +102,210 @@ class NoteCheckboxPanel(tk.Frame):
         self._on_checkbox_change()
 
 
+class ThumbnailStrip(tk.Frame):
+    
+    SLOT_WIDTH = THUMBNAIL_WIDTH + THUMBNAIL_GAP
+    
+    def __init__(self, parent, *args, on_select=None, cache_max_bytes=THUMBNAIL_CACHE_BYTES, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.on_select = on_select
+        self.on_pages_needed = None
+        self.cache = PageRasterCache(cache_max_bytes)
+        self.page_keys = []
+        self.page_count = 0
+        self.current_page = 0
+        self.slots = {}
+        self.photos = {}
+        self.update_id = None
+        self._create_widgets()
+    
+    def _create_widgets(self):
+        self.canvas = tk.Canvas(self, height=THUMBNAIL_HEIGHT + 24, bg="#eeeeee",
+                                highlightthickness=0)
+        self.canvas.pack(fill="x")
+        
+        self.scrollbar = tk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
+        self.scrollbar.pack(fill="x")
+        
+        self.canvas.config(xscrollcommand=self._on_scroll)
+        self.canvas.bind("<Configure>", self._schedule_update)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.canvas.xview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.canvas.xview_scroll(1, "units"))
+    
+    def set_on_pages_needed(self, callback):
+        self.on_pages_needed = callback
+    
+    def known_page_keys(self):
+        return self.cache.keys()
+    
+    def set_pages(self, page_count, current_page):
+        if page_count != self.page_count:
+            self.page_count = page_count
+            self._delete_slots()
+            self.canvas.config(scrollregion=(0, 0, page_count * self.SLOT_WIDTH, THUMBNAIL_HEIGHT + 24),
+                               xscrollincrement=self.SLOT_WIDTH)
+        
+        if current_page != self.current_page:
+            previous = self.current_page
+            self.current_page = current_page
+            self._highlight(previous)
+            self._highlight(current_page)
+            self._scroll_to(current_page)
+        
+        self._schedule_update()
+    
+    def show_thumbnails(self, page_keys, rendered):
+        for key, samples in rendered.items():
+            self.cache.put(key, PDFPreviewCanvas._samples_to_image(*samples))
+        
+        refresh = page_keys != self.page_keys
+        if refresh:
+            self.page_keys = list(page_keys)
+            self.photos.clear()
+        
+        for page, (frame_item, image_item) in self.slots.items():
+            if refresh or page not in self.photos:
+                self._set_slot_image(page, image_item)
+        
+        self._schedule_update()
+    
+    def visible_range(self):
+        self.canvas.update_idletasks()
+        left = self.canvas.canvasx(0)
+        width = max(self.canvas.winfo_width(), self.SLOT_WIDTH)
+        first = max(0, int(left // self.SLOT_WIDTH))
+        last = min(self.page_count, int((left + width) // self.SLOT_WIDTH) + 1)
+        return first, last
+    
+    def page_order(self):
+        first, last = self.visible_range()
+        order = list(range(first, last))
+        for offset in range(1, THUMBNAIL_PREFETCH_PAGES + 1):
+            for page in (last - 1 + offset, first - offset):
+                if 0 <= page < self.page_count:
+                    order.append(page)
+        return order
+    
+    def clear(self):
+        self.page_keys = []
+        self.page_count = 0
+        self.current_page = 0
+        self._delete_slots()
+        self.canvas.config(scrollregion=(0, 0, 0, 0))
+    
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_update()
+    
+    def _on_mouse_wheel(self, event):
+        self.canvas.xview_scroll(-1 if event.delta > 0 else 1, "units")
+    
+    def _on_click(self, event):
+        page = int(self.canvas.canvasx(event.x) // self.SLOT_WIDTH)
+        if 0 <= page < self.page_count and self.on_select:
+            self.on_select(page)
+    
+    def _scroll_to(self, page):
+        first, last = self.visible_range()
+        if first <= page < last - 1 or not self.page_count:
+            return
+        
+        visible = max(1, self.canvas.winfo_width() // self.SLOT_WIDTH)
+        target = max(0, page - visible // 2)
+        self.canvas.xview_moveto(target / self.page_count)
+    
+    def _schedule_update(self, event=None):
+        if self.update_id is None:
+            self.update_id = self.after_idle(self._update_slots)
+    
+    def _update_slots(self):
+        self.update_id = None
+        first, last = self.visible_range()
+        
+        for page in [page for page in self.slots if not first <= page < last]:
+            self.canvas.delete(f"thumb{page}")
+            del self.slots[page]
+            self.photos.pop(page, None)
+        
+        for page in range(first, last):
+            if page not in self.slots:
+                self._create_slot(page)
+        
+        missing = [page for page in self.page_order()
+                   if page >= len(self.page_keys) or self.page_keys[page] not in self.cache]
+        if missing and self.on_pages_needed:
+            self.on_pages_needed(missing)
+    
+    def _create_slot(self, page):
+        tag = f"thumb{page}"
+        x = page * self.SLOT_WIDTH + THUMBNAIL_GAP // 2
+        frame_item = self.canvas.create_rectangle(x, 4, x + THUMBNAIL_WIDTH, 4 + THUMBNAIL_HEIGHT,
+                                                  fill="white", outline="#999999", tags=(tag,))
+        image_item = self.canvas.create_image(x, 4, anchor="nw", tags=(tag,))
+        self.canvas.create_text(x + THUMBNAIL_WIDTH // 2, THUMBNAIL_HEIGHT + 14, text=str(page + 1),
+                                font=("Helvetica", 8), fill="gray", tags=(tag,))
+        self.slots[page] = (frame_item, image_item)
+        self._set_slot_image(page, image_item)
+        self._highlight(page)
+    
+    def _set_slot_image(self, page, image_item):
+        image = None
+        if page < len(self.page_keys):
+            image = self.cache.get(self.page_keys[page])
+        if image is None:
+            self.photos.pop(page, None)
+            self.canvas.itemconfigure(image_item, image="")
+            return
+        
+        from PIL import ImageTk
+        
+        photo = self.photos[page] = ImageTk.PhotoImage(image)
+        self.canvas.itemconfigure(image_item, image=photo)
+    
+    def _highlight(self, page):
+        if page not in self.slots:
+            return
+        
+        selected = page == self.current_page
+        self.canvas.itemconfigure(self.slots[page][0], outline="#2196F3" if selected else "#999999",
+                                  width=3 if selected else 1)
+    
+    def _delete_slots(self):
+        self.canvas.delete("all")
+        self.slots.clear()
+        self.photos.clear()
+
+
 class PDFPreviewCanvas(tk.Frame):
     
-    def __init__(self, parent, *args, **kwargs):
+    def __init__(self, parent, *args, cache_max_bytes=DEFAULT_MAX_BYTES, **kwargs):
         super().__init__(parent, *args, **kwargs)
-        self.pdf_path = None
-        self.images = []
+        self.page_cache = PageRasterCache(cache_max_bytes)
+        self.page_keys = []
         self.current_page = 0
         self.image_preview = None
         self.photo = None
+        self.vector_page_count = 0
+        self.vector_page_provider = None
+        self.clef_image_path = None
+        self.clef_source = None
+        self.clef_photos = {}
+        self.resized_cache = OrderedDict()
+        self.image_item = None
+        self.label_item = None
+        self.resize_settle_id = None
+        self.on_pages_needed = None
+        self.snapshot_photo = None
+        self.display_size = None
+        self.render_width = None
         self._create_widgets()
     
     def _create_widgets(self):
+        self.thumbnails = ThumbnailStrip(self, on_select=self.go_to_page)
+        self.thumbnails.pack(side="bottom", fill="x", pady=(5, 0))
+        
         main_frame = tk.Frame(self)
         main_frame.pack(fill="both", expand=True)
         
@@ -107,125 +322,485 @@ class PDFPreviewCanvas(tk.Frame):
         
         self.canvas.bind("<Configure>", self._on_canvas_configure)
     
-    def load_pdf(self, pdf_path):
-        if not os.path.exists(pdf_path):
-            self.clear()
+    def set_on_pages_needed(self, callback):
+        self.on_pages_needed = callback
+    
+    def set_on_thumbnails_needed(self, callback):
+        self.thumbnails.set_on_pages_needed(callback)
+    
+    def known_page_keys(self):
+        return {key for key in self.page_cache.keys() if self._is_sharp(key)}
+    
+    def preview_width(self):
+        if self.render_width is None:
+            self.render_width = self._display_geometry()[2]
+        return self.render_width
+    
+    def needs_draft(self):
+        if self.current_page >= len(self.page_keys):
+            return True
+        return self.page_keys[self.current_page] not in self.page_cache
+    
+    def show_thumbnails(self, page_keys, rendered):
+        self.thumbnails.show_thumbnails(page_keys, rendered)
+    
+    def known_thumbnail_keys(self):
+        return self.thumbnails.known_page_keys()
+    
+    def thumbnail_order(self):
+        return self.thumbnails.page_order()
+    
+    def cache_stats(self):
+        stats = self.page_cache.stats()
+        stats["resized_entries"] = len(self.resized_cache)
+        return stats
+    
+    def page_order(self, page_count=None):
+        if page_count is None:
+            page_count = self._page_count()
+        current = min(self.current_page, max(0, page_count - 1))
+        
+        order = [current]
+        for offset in range(1, PREFETCH_PAGES + 1):
+            for page in (current + offset, current - offset):
+                if 0 <= page < page_count:
+                    order.append(page)
+        return order
+    
+    def show_snapshot(self, image_path):
+        if self._page_count() or not os.path.exists(image_path):
             return
         
         try:
-            doc = fitz.open(pdf_path)
-            
-            self.images = []
-            zoom = 2.0
-            mat = fitz.Matrix(zoom, zoom)
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                pix = page.get_pixmap(matrix=mat)
-                img_data = pix.tobytes("png")
-                img = Image.open(io.BytesIO(img_data))
-                self.images.append(img)
-            
-            doc.close()
-            self.pdf_path = pdf_path
+            self.snapshot_photo = tk.PhotoImage(file=image_path)
+        except tk.TclError as e:
+            print(f"Erro ao carregar preview anterior: {e}")
+            return
+        
+        self.canvas.delete("all")
+        self.image_item = self.canvas.create_image(0, 0, anchor="nw", image=self.snapshot_photo)
+        self.label_item = self.canvas.create_text(0, 10, anchor="ne", text="Preview anterior (atualizando...)",
+                                                  font=("Helvetica", 10), fill="gray")
+        self._place_snapshot()
+    
+    def save_snapshot(self, image_path):
+        if self.vector_page_provider is not None or self.display_size is None:
+            return False
+        if self.current_page >= len(self.page_keys):
+            return False
+        
+        image = self.page_cache.get(self.page_keys[self.current_page])
+        if image is None:
+            return False
+        
+        from PIL import Image
+        
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        temp_path = f"{image_path}.tmp"
+        image.resize(self.display_size, Image.Resampling.LANCZOS).save(temp_path, format="PNG")
+        os.replace(temp_path, image_path)
+        return True
+    
+    def _place_snapshot(self):
+        self.canvas.update_idletasks()
+        canvas_width = max(self.canvas.winfo_width(), 1)
+        canvas_height = max(self.canvas.winfo_height(), 1)
+        x = (canvas_width - self.snapshot_photo.width()) // 2
+        y = (canvas_height - self.snapshot_photo.height()) // 2
+        self.canvas.coords(self.image_item, x, y)
+        self.canvas.coords(self.label_item, canvas_width - 10, 10)
+    
+    def show_pages(self, page_keys, rendered):
+        for key, samples in rendered.items():
+            image = self._samples_to_image(*samples)
+            previous = self.page_cache.peek(key)
+            if (previous is not None and previous.width > image.width
+                    and not self._matches_render_width(image.width)):
+                continue
+            self.page_cache.put(key, image)
+        
+        self.vector_page_provider = None
+        self.vector_page_count = 0
+        self.page_keys = list(page_keys)
+        
+        if self.current_page >= len(self.page_keys):
             self.current_page = 0
-            
-            self._update_navigation_buttons()
-            
-            self._redraw_image()
-            
-        except Exception as e:
-            print(f"Erro ao carregar PDF: {e}")
-            self.clear()
+        
+        self._update_navigation_buttons()
+        
+        self._redraw_image()
+    
+    def show_vector_preview(self, num_pages, page_provider, clef_image_path=None):
+        self.page_keys = []
+        self.resized_cache.clear()
+        self.vector_page_count = num_pages
+        self.vector_page_provider = page_provider
+        self.snapshot_photo = None
+        if clef_image_path != self.clef_image_path:
+            self.clef_image_path = clef_image_path
+            self.clef_source = None
+            self.clef_photos = {}
+        
+        if self.current_page >= num_pages:
+            self.current_page = 0
+        
+        self._update_navigation_buttons()
+        
+        self._redraw_image()
+    
+    def _page_count(self):
+        if self.vector_page_provider is not None:
+            return self.vector_page_count
+        return len(self.page_keys)
+    
+    def _matches_render_width(self, width):
+        return self.render_width is not None and abs(width - self.render_width) <= 1
+    
+    def _is_sharp(self, key):
+        image = self.page_cache.peek(key)
+        return image is not None and self._matches_render_width(image.width)
+    
+    def _request_pages(self):
+        missing = [page for page in self.page_order() if not self._is_sharp(self.page_keys[page])]
+        if missing and self.on_pages_needed:
+            self.on_pages_needed(missing)
+    
+    @staticmethod
+    def _samples_to_image(width, height, stride, samples):
+        from PIL import Image
+        
+        return Image.frombuffer("RGB", (width, height), samples, "raw", "RGB", stride, 1)
+    
+    def go_to_page(self, page):
+        if page == self.current_page or not 0 <= page < self._page_count():
+            return
+        
+        self.current_page = page
+        self._update_navigation_buttons()
+        self._redraw_image()
     
     def _prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self._update_navigation_buttons()
-            self._redraw_image()
+        self.go_to_page(self.current_page - 1)
     
     def _next_page(self):
-        if self.current_page < len(self.images) - 1:
-            self.current_page += 1
-            self._update_navigation_buttons()
-            self._redraw_image()
+        self.go_to_page(self.current_page + 1)
     
     def _update_navigation_buttons(self):
-        if len(self.images) <= 1:
+        page_count = self._page_count()
+        if page_count <= 1:
             self.btn_prev.config(state="disabled")
             self.btn_next.config(state="disabled")
         else:
             self.btn_prev.config(state="normal" if self.current_page > 0 else "disabled")
-            self.btn_next.config(state="normal" if self.current_page < len(self.images) - 1 else "disabled")
+            self.btn_next.config(state="normal" if self.current_page < page_count - 1 else "disabled")
+        
+        self.thumbnails.set_pages(page_count, self.current_page)
     
     def _on_canvas_configure(self, event=None):
-        if self.images:
+        if not self._page_count():
+            if self.snapshot_photo is not None:
+                self._place_snapshot()
+            return
+        
+        if self.vector_page_provider is not None:
             self._redraw_image()
+            return
+        
+        if self.resize_settle_id is not None:
+            self.after_cancel(self.resize_settle_id)
+        self.resize_settle_id = self.after(RESIZE_SETTLE_MS, self._on_resize_settled)
+        
+        self._redraw_image(fast=True)
     
-    def _redraw_image(self):
-        if not self.images or self.current_page >= len(self.images):
+    def _on_resize_settled(self):
+        self.resize_settle_id = None
+        self._redraw_image()
+    
+    def _display_geometry(self):
+        self.canvas.update_idletasks()
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        
+        if canvas_width <= 1 or canvas_height <= 1:
+            canvas_width = 500
+            canvas_height = 700
+        
+        a4_ratio = 297.0 / 210.0
+        
+        max_width_by_canvas = canvas_width
+        max_height_by_width = max_width_by_canvas * a4_ratio
+        
+        max_height_by_canvas = canvas_height
+        max_width_by_height = max_height_by_canvas / a4_ratio
+        
+        if max_height_by_width <= canvas_height:
+            display_width = max_width_by_canvas
+            display_height = max_height_by_width
+        else:
+            display_width = max_width_by_height
+            display_height = max_height_by_canvas
+        
+        return canvas_width, canvas_height, int(display_width), int(display_height)
+    
+    def _draw_page_label(self, canvas_width):
+        page_count = self._page_count()
+        if page_count > 1:
+            page_text = f"Página {self.current_page + 1} de {page_count}"
+            self.canvas.create_text(canvas_width - 10, 10, anchor="ne", 
+                                   text=page_text, font=("Helvetica", 10), fill="gray")
+    
+    def _update_page_label(self, canvas_width, loading=False):
+        page_count = self._page_count()
+        if page_count <= 1 and not loading:
+            if self.label_item is not None:
+                self.canvas.delete(self.label_item)
+                self.label_item = None
+            return
+        
+        page_text = f"Página {self.current_page + 1} de {page_count}"
+        if loading:
+            page_text += " (carregando...)"
+        if self.label_item is None:
+            self.label_item = self.canvas.create_text(canvas_width - 10, 10, anchor="ne",
+                                                      text=page_text, font=("Helvetica", 10), fill="gray")
+        else:
+            self.canvas.coords(self.label_item, canvas_width - 10, 10)
+            self.canvas.itemconfigure(self.label_item, text=page_text)
+            self.canvas.tag_raise(self.label_item)
+    
+    def _resized_photo(self, page, width, height):
+        image = self.page_cache.get(self.page_keys[page])
+        if image is None:
+            return None
+        
+        from PIL import Image, ImageTk
+        
+        if abs(image.width - width) > 1:
+            with profiler.span("preview.resize"):
+                return ImageTk.PhotoImage(image.resize((width, height), Image.Resampling.BILINEAR,
+                                                       reducing_gap=1.0))
+        
+        key = (self.page_keys[page], image.size)
+        photo = self.resized_cache.get(key)
+        if photo is not None:
+            self.resized_cache.move_to_end(key)
+            return photo
+        
+        photo = ImageTk.PhotoImage(image)
+        self.resized_cache[key] = photo
+        while len(self.resized_cache) > RESIZED_CACHE_SIZE:
+            self.resized_cache.popitem(last=False)
+        return photo
+    
+    @timed("preview.redraw")
+    def _redraw_image(self, fast=False):
+        if self.vector_page_provider is not None:
+            self._redraw_vector()
+            return
+        
+        if self.current_page >= len(self.page_keys):
             return
         
         try:
-            image = self.images[self.current_page]
+            canvas_width, canvas_height, final_width, final_height = self._display_geometry()
+            if not fast or self.render_width is None:
+                self.render_width = final_width
             
-            self.canvas.update_idletasks()
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
+            self.photo = self._resized_photo(self.current_page, final_width, final_height)
+            if self.photo is not None:
+                self.snapshot_photo = None
+                final_width, final_height = self.photo.width(), self.photo.height()
+                self.display_size = (final_width, final_height)
+                image = self.photo
+            else:
+                image = self.snapshot_photo if self.snapshot_photo is not None else ""
             
-            if canvas_width <= 1 or canvas_height <= 1:
-                canvas_width = 500
-                canvas_height = 700
+            x = (canvas_width - final_width) // 2
+            y = (canvas_height - final_height) // 2
+            if self.image_item is None:
+                self.canvas.delete("all")
+                self.label_item = None
+                self.image_item = self.canvas.create_image(x, y, anchor="nw", image=image)
+            else:
+                self.canvas.coords(self.image_item, x, y)
+                self.canvas.itemconfigure(self.image_item, image=image)
             
-            a4_ratio = 297.0 / 210.0
+            self._update_page_label(canvas_width, loading=self.photo is None)
             
-            max_width_by_canvas = canvas_width
-            max_height_by_width = max_width_by_canvas * a4_ratio
+            self.canvas.config(scrollregion=(0, 0, canvas_width, canvas_height))
             
-            max_height_by_canvas = canvas_height
-            max_width_by_height = max_height_by_canvas / a4_ratio
+            self._request_pages()
             
-            if max_height_by_width <= canvas_height:
-                display_width = max_width_by_canvas
-                display_height = max_height_by_width
-            else:
-                display_width = max_width_by_height
-                display_height = max_height_by_canvas
+        except Exception as e:
+            print(f"Erro ao redesenhar imagem: {e}")
+    
+    def _redraw_vector(self):
+        if self.current_page >= self.vector_page_count:
+            return
+        
+        try:
+            page_layout = self.vector_page_provider(self.current_page)
             
-            final_width = int(display_width)
-            final_height = int(display_height)
+            canvas_width, canvas_height, final_width, final_height = self._display_geometry()
+            origin_x = (canvas_width - final_width) // 2
+            origin_y = (canvas_height - final_height) // 2
+            scale = final_width / settings.PAGE_WIDTH
+            line_width = max(1.0, scale)
             
-            self.image_preview = image.resize((final_width, final_height), Image.Resampling.LANCZOS)
+            def to_x(x):
+                return origin_x + x * scale
             
-            self.photo = ImageTk.PhotoImage(self.image_preview)
+            def to_y(y):
+                return origin_y + (settings.PAGE_HEIGHT - y) * scale
             
             self.canvas.delete("all")
-            x = (canvas_width - final_width) // 2
-            y = (canvas_height - final_height) // 2
-            self.canvas.create_image(x, y, anchor="nw", image=self.photo)
+            self.image_item = None
+            self.label_item = None
+            self.image_preview = None
+            self.photo = None
+            self.canvas.create_rectangle(origin_x, origin_y,
+                                         origin_x + final_width, origin_y + final_height,
+                                         fill="white", outline="#cccccc")
+            
+            staff_left = to_x(settings.X_START)
+            staff_right = to_x(settings.X_START + settings.STAFF_WIDTH)
+            barline_x = to_x(settings.BARLINE_X)
+            radius = settings.NOTE_RADIUS * scale
             
-            if len(self.images) > 1:
-                page_text = f"Página {self.current_page + 1} de {len(self.images)}"
-                self.canvas.create_text(canvas_width - 10, 10, anchor="ne", 
-                                       text=page_text, font=("Helvetica", 10), fill="gray")
+            for staff_index in range(page_layout.staff_count):
+                y_staff = page_layout.staff_y[staff_index]
+                
+                for line in range(5):
+                    line_y = to_y(y_staff + line * 10)
+                    self.canvas.create_line(staff_left, line_y, staff_right, line_y, width=line_width)
+                
+                self.canvas.create_line(barline_x, to_y(y_staff), barline_x, to_y(y_staff + 40),
+                                        width=line_width)
+                
+                self._draw_vector_clef(y_staff, page_layout.clef_boxes[staff_index],
+                                       scale, to_x, to_y, line_width)
+                
+                for i in page_layout.staff_ledgers(staff_index):
+                    line_y = to_y(page_layout.ledger_y[i])
+                    self.canvas.create_line(to_x(page_layout.ledger_x1[i]), line_y,
+                                            to_x(page_layout.ledger_x2[i]), line_y,
+                                            width=line_width)
+                
+                for i in page_layout.staff_heads(staff_index):
+                    note_x = to_x(page_layout.head_x[i])
+                    note_y = to_y(page_layout.head_y[i])
+                    fill = "white" if page_layout.head_filled[i] else ""
+                    self.canvas.create_oval(note_x - radius, note_y - radius,
+                                            note_x + radius, note_y + radius,
+                                            outline="black", fill=fill, width=line_width)
+            
+            self._draw_page_label(canvas_width)
             
             self.canvas.config(scrollregion=(0, 0, canvas_width, canvas_height))
             
         except Exception as e:
-            print(f"Erro ao redesenhar imagem: {e}")
+            print(f"Erro ao desenhar preview vetorial: {e}")
+    
+    def _draw_vector_clef(self, y_staff, clef_box, scale, to_x, to_y, line_width):
+        clef_x, clef_y, clef_width, clef_height = clef_box
+        photo = self._get_clef_photo(clef_width * scale, clef_height * scale)
+        
+        if photo is None:
+            self.canvas.create_line(to_x(settings.X_START), to_y(y_staff),
+                                    to_x(settings.X_START), to_y(y_staff + 40), width=line_width)
+            return
+        
+        center_x = to_x(clef_x + clef_width / 2)
+        center_y = to_y(clef_y + clef_height / 2)
+        self.canvas.create_image(center_x, center_y, anchor="center", image=photo)
+    
+    def _get_clef_photo(self, box_width, box_height):
+        from PIL import Image, ImageTk
+        
+        if self.clef_source is None:
+            if not self.clef_image_path or not os.path.exists(self.clef_image_path):
+                return None
+            self.clef_source = Image.open(self.clef_image_path).convert("RGBA")
+        
+        source_width, source_height = self.clef_source.size
+        fit = min(box_width / source_width, box_height / source_height)
+        size = (max(1, round(source_width * fit)), max(1, round(source_height * fit)))
+        
+        photo = self.clef_photos.get(size)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self.clef_source.resize(size, Image.Resampling.LANCZOS))
+            self.clef_photos[size] = photo
+        return photo
     
     def clear(self):
         self.canvas.delete("all")
-        self.pdf_path = None
-        self.images = []
+        self.image_item = None
+        self.label_item = None
+        self.resized_cache.clear()
+        self.page_keys = []
+        self.vector_page_count = 0
+        self.vector_page_provider = None
         self.current_page = 0
         self.image_preview = None
         self.photo = None
+        self.snapshot_photo = None
         self._update_navigation_buttons()
 
 
+class ExportProgressDialog(tk.Toplevel):
+    
+    def __init__(self, parent, total_pages, on_cancel=None):
+        super().__init__(parent)
+        self.total_pages = total_pages
+        self.on_cancel = on_cancel
+        
+        self.title("Gerando PDF")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+        
+        self._create_widgets()
+        
+        try:
+            self.grab_set()
+        except tk.TclError:
+            pass
+    
+    def _create_widgets(self):
+        self.status_label = tk.Label(self, text=f"Página 0 de {self.total_pages}",
+                                     font=("Helvetica", 10))
+        self.status_label.pack(padx=20, pady=(15, 5))
+        
+        self.progress_bar = ttk.Progressbar(self, length=300, mode="determinate",
+                                            maximum=max(1, self.total_pages))
+        self.progress_bar.pack(padx=20, pady=5)
+        
+        self.cancel_btn = tk.Button(self, text="Cancelar", command=self._cancel, width=12)
+        self.cancel_btn.pack(pady=(5, 15))
+    
+    def set_progress(self, done_pages):
+        self.progress_bar["value"] = done_pages
+        self.status_label.config(text=f"Página {done_pages} de {self.total_pages}")
+    
+    def _cancel(self):
+        self.cancel_btn.config(state="disabled")
+        self.status_label.config(text="Cancelando...")
+        if self.on_cancel:
+            self.on_cancel()
+    
+    def close(self):
+        self.grab_release()
+        self.destroy()
+
+
 class ConfigurationPanel(tk.Frame):
     
+    RASTER_COLORS = (
+        ("Colorido", "rgb"),
+        ("Tons de cinza", "cinza"),
+        ("Preto e branco (1 bit)", "1bit"),
+    )
+    
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.output_path = tk.StringVar(value="")
@@ -258,7 +833,7 @@ class ConfigurationPanel(tk.Frame):
         gap_label.pack(side="left", padx=(0, 5))
         
         self.gap_var = tk.DoubleVar(value=5.0)
-        gap_spinbox = tk.Spinbox(gap_frame, from_=3.0, to=20.0, 
+        gap_spinbox = tk.Spinbox(gap_frame, from_=settings.MIN_STAFF_GAP_CM, to=settings.MAX_STAFF_GAP_CM, 
                                  increment=0.1, textvariable=self.gap_var, 
                                  width=10, command=self._on_gap_change)
         gap_spinbox.pack(side="left")
@@ -275,7 +850,7 @@ class ConfigurationPanel(tk.Frame):
         notes_per_staff_label.pack(side="left", padx=(0, 5))
         
         self.notes_per_staff_var = tk.IntVar(value=17)
-        notes_per_staff_spinbox = tk.Spinbox(notes_per_staff_frame, from_=1, to=17, 
+        notes_per_staff_spinbox = tk.Spinbox(notes_per_staff_frame, from_=1, to=settings.MAX_NOTES_PER_STAFF, 
                                              textvariable=self.notes_per_staff_var, width=10,
                                              command=self._on_notes_per_staff_change)
         notes_per_staff_spinbox.pack(side="left")
@@ -321,6 +896,58 @@ class ConfigurationPanel(tk.Frame):
                                      command=self._on_mode_change)
         random_radio.pack(side="left")
         
+        constraints_frame = tk.Frame(self)
+        constraints_frame.pack(fill="x", pady=(0, 15))
+        
+        self.no_repeat_var = tk.BooleanVar(value=False)
+        no_repeat_check = tk.Checkbutton(constraints_frame, text="Não repetir a mesma nota em seguida",
+                                         variable=self.no_repeat_var, font=("Helvetica", 9),
+                                         command=self._on_mode_change)
+        no_repeat_check.pack(anchor="w")
+        
+        self.cover_strings_var = tk.BooleanVar(value=False)
+        cover_strings_check = tk.Checkbutton(constraints_frame, text="Incluir todas as cordas em cada pauta",
+                                             variable=self.cover_strings_var, font=("Helvetica", 9),
+                                             command=self._on_mode_change)
+        cover_strings_check.pack(anchor="w")
+        
+        interval_frame = tk.Frame(constraints_frame)
+        interval_frame.pack(anchor="w")
+        
+        interval_label = tk.Label(interval_frame, text="Salto máximo (notas, 0 = livre):",
+                                  font=("Helvetica", 9))
+        interval_label.pack(side="left", padx=(0, 5))
+        
+        self.max_interval_var = tk.IntVar(value=0)
+        interval_spinbox = tk.Spinbox(interval_frame, from_=0, to=16,
+                                      textvariable=self.max_interval_var, width=5,
+                                      command=self._on_mode_change)
+        interval_spinbox.pack(side="left")
+        
+        self.compact_var = tk.BooleanVar(value=False)
+        compact_check = tk.Checkbutton(self, text="PDF compacto (arquivo menor)",
+                                       variable=self.compact_var, font=("Helvetica", 9))
+        compact_check.pack(anchor="w", pady=(0, 15))
+        
+        raster_frame = tk.Frame(self)
+        raster_frame.pack(fill="x", pady=(0, 15))
+        
+        raster_label = tk.Label(raster_frame, text="Imagens (.png/.tif):", font=("Helvetica", 9))
+        raster_label.pack(side="left", padx=(0, 5))
+        
+        self.raster_dpi_var = tk.IntVar(value=150)
+        dpi_spinbox = tk.Spinbox(raster_frame, from_=settings.MIN_DPI, to=settings.MAX_DPI, increment=50,
+                                 textvariable=self.raster_dpi_var, width=5)
+        dpi_spinbox.pack(side="left")
+        
+        dpi_label = tk.Label(raster_frame, text="dpi", font=("Helvetica", 9))
+        dpi_label.pack(side="left", padx=(2, 10))
+        
+        self.raster_color_var = tk.StringVar(value=self.RASTER_COLORS[0][0])
+        color_combo = ttk.Combobox(raster_frame, textvariable=self.raster_color_var, width=18,
+                                   values=[label for label, _ in self.RASTER_COLORS], state="readonly")
+        color_combo.pack(side="left")
+        
         output_frame = tk.Frame(self)
         output_frame.pack(fill="x", pady=(0, 10))
         
@@ -342,7 +969,8 @@ class ConfigurationPanel(tk.Frame):
     def _browse_output_path(self):
         filename = filedialog.asksaveasfilename(
             defaultextension=".pdf",
-            filetypes=[("PDF files", "*.pdf"), ("All files", "*.*")],
+            filetypes=[("PDF files", "*.pdf"), ("PNG (uma imagem por página)", "*.png"),
+                       ("TIFF (várias páginas)", "*.tif *.tiff"), ("All files", "*.*")],
             title="Escolher local para salvar PDF"
         )
         if filename:
@@ -386,6 +1014,24 @@ class ConfigurationPanel(tk.Frame):
     def get_mode(self):
         return self.mode_var.get()
     
+    def get_constraints(self):
+        max_interval = self.max_interval_var.get()
+        return {
+            "no_repeat": self.no_repeat_var.get(),
+            "max_interval": max_interval if max_interval > 0 else None,
+            "cover_strings": self.cover_strings_var.get(),
+        }
+    
+    def get_raster_options(self):
+        colors = dict(self.RASTER_COLORS)
+        return {
+            "dpi": self.raster_dpi_var.get(),
+            "color": colors.get(self.raster_color_var.get(), "rgb"),
+        }
+    
+    def get_output_profile(self):
+        return "compacto" if self.compact_var.get() else "padrao"
+    
     def get_output_path(self):
         return self.output_path.get()
 
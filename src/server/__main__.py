@@ -0,0 +1,6 @@
+import sys
+
+from src.server.service import main
+
+
+sys.exit(main())
@@ -0,0 +1,391 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.cli.batch import normalize_job, job_params, generator_options
+from src.core import layout
+from src.core.export import DEFAULT_CHUNK_PAGES, StreamingPDFExporter
+from src.core.pdf_cache import MemoryPDFCache, normalize_params, is_cacheable, cache_key
+from src.core.pdf_generator import PautaPDFGenerator
+from src.core.profiling import SpanStats
+
+
+DEFAULT_HOST = "127.0.0.1"
+
+DEFAULT_PORT = 8000
+
+DEFAULT_QUEUE_SIZE = 16
+
+DEFAULT_CACHE_MB = 64
+
+MAX_PAGES = 2000
+
+MAX_BODY_BYTES = 64 * 1024
+
+REQUEST_TIMEOUT = 300
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+LATENCY_WINDOW = 1000
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+_generators = {}
+
+
+def _render_worksheet(params, options, temp_dir):
+    key = tuple(sorted(options.items()))
+    generator = _generators.get(key)
+    if generator is None:
+        generator = _generators[key] = PautaPDFGenerator(**options)
+    
+    if params["num_pages"] <= DEFAULT_CHUNK_PAGES:
+        return "bytes", generator.generate_bytes(**params)
+    
+    temp_fd, temp_path = tempfile.mkstemp(suffix=".pdf", dir=temp_dir)
+    os.close(temp_fd)
+    try:
+        StreamingPDFExporter(generator).generate(output_path=temp_path, **params)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return "file", temp_path
+
+
+def _discard_result(future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    kind, payload = future.result()
+    if kind == "file":
+        try:
+            os.remove(payload)
+        except OSError:
+            pass
+
+
+def request_params(raw):
+    if not isinstance(raw, dict):
+        raise ValueError("O corpo da requisição deve ser um objeto JSON")
+    
+    job = normalize_job(raw, require_output=False)
+    if job["format"] != "pdf":
+        raise ValueError("O servidor só gera PDF")
+    if job["pages"] > MAX_PAGES:
+        raise ValueError(f"O número de páginas deve ser no máximo {MAX_PAGES}")
+    
+    params = job_params(job)
+    if params["random_mode"]:
+        params["seed"] = layout.resolve_seed(params["seed"])
+    return params, generator_options(job)
+
+
+class ServiceMetrics:
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.responses = Counter()
+        self.rejected = 0
+        self.pages = 0
+        self.bytes_sent = 0
+        self.latency = SpanStats()
+        self.render_latency = SpanStats()
+        self._recent = deque(maxlen=LATENCY_WINDOW)
+    
+    def record_response(self, status, seconds, pages=0, size=0):
+        with self._lock:
+            self.responses[status] += 1
+            self.latency.add(seconds)
+            self._recent.append(seconds)
+            if status == 200:
+                self.pages += pages
+                self.bytes_sent += size
+    
+    def record_render(self, seconds):
+        with self._lock:
+            self.render_latency.add(seconds)
+    
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+    
+    def snapshot(self):
+        with self._lock:
+            uptime = time.time() - self.started
+            recent = sorted(self._recent)
+            total = sum(self.responses.values())
+            
+            def percentile(fraction):
+                if not recent:
+                    return 0.0
+                return recent[min(len(recent) - 1, int(fraction * len(recent)))] * 1000
+            
+            return {
+                "uptime_seconds": uptime,
+                "requests": total,
+                "responses": {str(status): count for status, count in sorted(self.responses.items())},
+                "rejected": self.rejected,
+                "pages": self.pages,
+                "bytes_sent": self.bytes_sent,
+                "requests_per_second": total / uptime if uptime else 0.0,
+                "pages_per_second": self.pages / uptime if uptime else 0.0,
+                "latency": dict(self.latency.to_dict(), p50_ms=percentile(0.5),
+                                p95_ms=percentile(0.95), p99_ms=percentile(0.99)),
+                "render_latency": self.render_latency.to_dict(),
+            }
+
+
+class WorksheetService:
+    
+    def __init__(self, workers=None, queue_size=DEFAULT_QUEUE_SIZE, cache_max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.cache = MemoryPDFCache(cache_max_bytes)
+        self.metrics = ServiceMetrics()
+        self.temp_dir = tempfile.mkdtemp(prefix="gerador_pauta_")
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._pending = 0
+        self._in_flight = {}
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+    
+    def render(self, params, options=None):
+        options = options or {}
+        key = None
+        if params["num_pages"] <= DEFAULT_CHUNK_PAGES:
+            normalized = normalize_params(**params)
+            if is_cacheable(normalized):
+                key = cache_key(normalized, PautaPDFGenerator(**options).cache_signature())
+        
+        with self._lock:
+            if key is not None:
+                data = self.cache.get(key)
+                if data is not None:
+                    return "bytes", data, True
+            
+            future = self._in_flight.get(key) if key is not None else None
+            leader = future is None
+            if leader:
+                if not self._slots.acquire(blocking=False):
+                    self.metrics.record_rejected()
+                    raise ServiceBusy()
+                self._pending += 1
+                submitted = time.perf_counter()
+                future = self._executor.submit(_render_worksheet, params, options, self.temp_dir)
+                future.add_done_callback(lambda f: self._job_done(submitted))
+                if key is not None:
+                    self._in_flight[key] = future
+        
+        payload = None
+        try:
+            kind, payload = future.result(timeout=REQUEST_TIMEOUT)
+        except TimeoutError:
+            if key is None:
+                future.add_done_callback(_discard_result)
+            raise
+        finally:
+            if leader and key is not None:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                    if payload is not None:
+                        self.cache.put(key, payload)
+        return kind, payload, False
+    
+    def _job_done(self, submitted):
+        self.metrics.record_render(time.perf_counter() - submitted)
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+    
+    def metrics_snapshot(self):
+        snapshot = self.metrics.snapshot()
+        with self._lock:
+            snapshot["pool"] = {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "pending": self._pending,
+                "coalescing": len(self._in_flight),
+            }
+            snapshot["cache"] = self.cache.stats()
+        return snapshot
+    
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class WorksheetRequestHandler(BaseHTTPRequestHandler):
+    
+    server_version = "GeradorPauta/1.0"
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.server.service.metrics_snapshot())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"erro": "Caminho não encontrado"})
+    
+    def do_POST(self):
+        start = time.perf_counter()
+        service = self.server.service
+        
+        status, pages, size = self._handle_post(service)
+        service.metrics.record_response(status, time.perf_counter() - start, pages, size)
+    
+    def _handle_post(self, service):
+        if self.path not in ("/", "/pauta"):
+            self._send_json(404, {"erro": "Caminho não encontrado"})
+            return 404, 0, 0
+        
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"erro": "Requisição grande demais ou sem tamanho válido"})
+            return 413, 0, 0
+        
+        try:
+            raw = json.loads(self.rfile.read(length) or b"{}")
+            params, options = request_params(raw)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"erro": str(e)})
+            return 400, 0, 0
+        
+        try:
+            kind, payload, hit = service.render(params, options)
+        except ServiceBusy:
+            self._send_json(503, {"erro": "Servidor ocupado, tente novamente"}, {"Retry-After": "1"})
+            return 503, 0, 0
+        except TimeoutError:
+            self._send_json(504, {"erro": "Tempo esgotado ao gerar o PDF"})
+            return 504, 0, 0
+        except Exception as e:
+            self._send_json(500, {"erro": f"Erro ao gerar PDF: {e}"})
+            return 500, 0, 0
+        
+        headers = {"X-Cache": "HIT" if hit else "MISS"}
+        if params["random_mode"]:
+            headers["X-Pauta-Seed"] = str(params["seed"])
+        
+        try:
+            if kind == "file":
+                size = self._send_file(payload, headers)
+            else:
+                size = self._send_bytes(payload, headers)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            return 499, 0, 0
+        return 200, params["num_pages"], size
+    
+    def _send_pdf_headers(self, size, headers):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(size))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+    
+    def _send_bytes(self, data, headers):
+        self._send_pdf_headers(len(data), headers)
+        view = memoryview(data)
+        for offset in range(0, len(data), STREAM_CHUNK_BYTES):
+            self.wfile.write(view[offset:offset + STREAM_CHUNK_BYTES])
+        return len(data)
+    
+    def _send_file(self, path, headers):
+        try:
+            size = os.path.getsize(path)
+            self._send_pdf_headers(size, headers)
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, STREAM_CHUNK_BYTES)
+            return size
+        finally:
+            os.remove(path)
+    
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class WorksheetServer(ThreadingHTTPServer):
+    
+    daemon_threads = True
+    request_queue_size = 128
+    
+    def __init__(self, address, service, verbose=False):
+        super().__init__(address, WorksheetRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, queue_size=DEFAULT_QUEUE_SIZE, cache_mb=DEFAULT_CACHE_MB, verbose=False):
+    service = WorksheetService(workers, queue_size, cache_mb * 1024 * 1024)
+    try:
+        return WorksheetServer((host, port), service, verbose)
+    except BaseException:
+        service.close()
+        raise
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m src.server",
+        description="Servidor HTTP local que gera pautas em PDF sob demanda (POST /pauta com parâmetros em JSON)."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"endereço de escuta (padrão: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"porta (padrão: {DEFAULT_PORT})")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="processos de geração (padrão: número de CPUs)")
+    parser.add_argument("--queue", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"pedidos aguardando além dos processos antes de responder 503 (padrão: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB,
+                        help=f"tamanho do cache de PDFs em memória, em MB (padrão: {DEFAULT_CACHE_MB})")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="registra cada requisição no terminal")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    
+    server = create_server(args.host, args.port, args.workers, max(0, args.queue),
+                           args.cache_mb, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Servidor em http://{host}:{port} ({server.service.workers} processos, fila {args.queue})")
+    print("POST /pauta gera um PDF; GET /metrics mostra as estatísticas. Ctrl+C encerra.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+    return 0
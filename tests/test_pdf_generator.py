@@ -0,0 +1,25 @@
+import unittest
+
+from src.config import settings
+from src.core.pdf_generator import PautaPDFGenerator
+
+
+def generate(profile, num_pages=2):
+    return PautaPDFGenerator(output_profile=profile).generate_bytes(
+        settings.DEFAULT_SEQUENCE, 6, num_pages, random_mode=True, notes_per_staff=17, seed=1)
+
+
+class CompactProfileTest(unittest.TestCase):
+    
+    def test_compact_streams_are_binary(self):
+        self.assertIn(b"/ASCII85Decode", generate("padrao"))
+        self.assertNotIn(b"/ASCII85Decode", generate("compacto"))
+    
+    def test_compact_is_smaller_with_same_pages(self):
+        default, compact = generate("padrao"), generate("compacto")
+        self.assertLess(len(compact), len(default))
+        self.assertEqual(compact.count(b"/Type /Page\n"), default.count(b"/Type /Page\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
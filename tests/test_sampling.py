@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from src.config import settings
+from src.core import pitch
+from src.core.sampling import sample_document
+
+
+def frequencies(notes, constraints, num_pages=64, quantity=6, notes_per_staff=17):
+    codes = sample_document(pitch.encode(notes), quantity, num_pages, notes_per_staff, 7, constraints)
+    counts = np.bincount(codes.ravel(), minlength=len(pitch.PITCH_NAMES))
+    return {note: counts[pitch.PITCH_CODES[note]] / codes.size for note in notes}
+
+
+class WeightedSamplingTest(unittest.TestCase):
+    
+    def assert_matches_weights(self, notes, weights, constraints=None):
+        observed = frequencies(notes, dict(constraints or {}, weights=weights))
+        total = sum(weights.get(note, 1.0) for note in notes)
+        for note in notes:
+            self.assertAlmostEqual(observed[note], weights.get(note, 1.0) / total, delta=0.02, msg=note)
+    
+    def test_weights_set_note_frequencies(self):
+        self.assert_matches_weights(settings.DEFAULT_SEQUENCE, {"Sol3": 10})
+    
+    def test_weights_with_few_notes(self):
+        self.assert_matches_weights(["Sol3", "La3", "Si3"], {"Sol3": 10})
+    
+    def test_zero_weight_excludes_note(self):
+        observed = frequencies(["Sol3", "La3", "Si3"], {"weights": {"Si3": 0}})
+        self.assertEqual(observed["Si3"], 0)
+    
+    def test_no_repeat_still_applies_with_weights(self):
+        constraints = {"weights": {"Sol3": 10}, "no_repeat": True}
+        codes = sample_document(pitch.encode(settings.DEFAULT_SEQUENCE), 6, 8, 17, 7, constraints)
+        self.assertFalse((codes[..., 1:] == codes[..., :-1]).any())
+    
+    def test_uniform_draws_each_note_once_per_cycle(self):
+        notes = settings.DEFAULT_SEQUENCE
+        codes = sample_document(pitch.encode(notes), 6, 4, len(notes), 7)
+        for row in codes.reshape(-1, len(notes)):
+            self.assertEqual(sorted(row.tolist()), sorted(pitch.encode(notes)))
+
+
+if __name__ == "__main__":
+    unittest.main()